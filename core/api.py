@@ -21,6 +21,7 @@
 from __future__ import annotations
 
 import os
+import re
 import shutil
 import time
 from getpass import getpass
@@ -1100,6 +1101,14 @@ def get_reachable_chat_models(client, *, probe: bool = False, timeout: float = 2
         return []
 
 
+# Offensichtliche Nicht-Chat-Familien (Embeddings, Moderation, Audio, TTS …) als
+# ein vorkompilierter Regex – ein C-Scan statt Python-Schleife pro Modell-ID.
+# "embedding" deckt "embeddings" ab, "moderation" auch "omni-moderation".
+_NON_CHAT_RE = re.compile(r"embedding|moderation|whisper|audio|tts|image|vision|batch")
+# Typische Chat-Familien; str.startswith nimmt das Tupel direkt (Vergleich in C)
+_CHAT_PREFIXES = ("gpt-", "o1", "o3")
+
+
 # New version of is_chat_model(): No further Hard-Pinning of LLM-Models.
 def is_chat_model(name: str) -> bool:
     """
@@ -1117,25 +1126,13 @@ def is_chat_model(name: str) -> bool:
     nid = name.lower().strip()
 
     # 1) offensichtliche Nicht-Chat-Familien hart ausschließen
-    block_substrings = (
-        "embedding",
-        "embeddings",
-        "moderation",
-        "omni-moderation",
-        "whisper",
-        "audio",
-        "tts",
-        "image",
-        "vision",
-        "batch",
-    )
-    if any(bad in nid for bad in block_substrings):
+    if _NON_CHAT_RE.search(nid):
         return False
 
     # 2) typische Chat-Familien
     #    - alles, was mit "gpt-" beginnt → GPT-3.5/4/5/…
     #    - neue o*-Familien (o1, o3, …), falls du die später nutzen willst
-    if nid.startswith("gpt-") or nid.startswith("o1") or nid.startswith("o3"):
+    if nid.startswith(_CHAT_PREFIXES):
         return True
 
     # 3) Fallback: Modelle, die explizit "chat" im Namen tragen
@@ -6,7 +6,6 @@ import json
 import os
 import re
 import time
-from datetime import datetime
 from pathlib import Path
 
 from cryptography.fernet import Fernet, InvalidToken
@@ -41,7 +40,7 @@ def _history_key_for_uid(uid: str, master: str) -> Fernet:
 
 
 def _now_iso() -> str:
-    return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
 
 
 # -------------------------------------------------------------------
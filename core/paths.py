@@ -94,6 +94,9 @@ DATA_DIR = pathlib.Path(
 # -----------------------------
 DOCS_DIR = DATA_DIR / "docs"
 
+# Mitgelieferte Beispiel-Prompts (repo-unabhängig, in CONF_DIR)
+GLOBAL_PROMPTS_DIR = CONF_DIR / "docs" / "prompts"
+
 
 def _ensure_dir_secure(path: pathlib.Path) -> pathlib.Path:
     if SYSTEM == "Windows":
@@ -210,8 +213,7 @@ def repo_prompts_dir() -> pathlib.Path:
 
 def global_prompts_dir() -> pathlib.Path:
     """Repo-unabhängiger Ort für mitgelieferte Beispiel-Prompts."""
-    d = CONF_DIR / "docs" / "prompts"  # ~/.config/chatti-cli/docs/prompts
-    return _ensure_dir_secure(d)
+    return _ensure_dir_secure(GLOBAL_PROMPTS_DIR)  # ~/.config/chatti-cli/docs/prompts
 
 
 def user_prompts_dir(uid: str) -> pathlib.Path:
@@ -220,22 +222,23 @@ def user_prompts_dir(uid: str) -> pathlib.Path:
     return _ensure_dir_secure(d)
 
 
-def ensure_global_prompts_seed(copy_max: int | None = None) -> None:
+def ensure_global_prompts_seed(copy_max: int | None = None) -> bool:
     """
     Initialisiert den globalen Prompt-Ordner (~/.config/chatti-cli/docs/prompts)
     mit Beispielen aus dem Repo (docs/prompts).
     Kopiert nur, wenn im globalen Ordner noch keine Dateien liegen.
+    Gibt True zurück, wenn danach Prompts im globalen Ordner liegen.
     """
     dst = global_prompts_dir()
     try:
-        # wenn schon Dateien da sind → fertig
-        if any(p.is_file() for p in dst.iterdir()):
-            return
+        # wenn schon Dateien da sind → fertig (Punktdateien wie Seed-Marker zählen nicht)
+        if any(p.is_file() and not p.name.startswith(".") for p in dst.iterdir()):
+            return True
 
         src = repo_prompts_dir()
         # Self-copy vermeiden oder fehlende Quelle
         if not src.exists() or src.resolve() == dst.resolve():
-            return
+            return False
 
         count = 0
         for p in sorted(src.iterdir()):
@@ -244,9 +247,10 @@ def ensure_global_prompts_seed(copy_max: int | None = None) -> None:
                 count += 1
                 if copy_max and count >= copy_max:
                     break
+        return count > 0
     except Exception:
         # Onboarding darf hier nie hart crashen
-        pass
+        return False
 
 
 def ensure_user_prompts_initialized(uid: str, *, copy_max: int = 3) -> None:
@@ -275,12 +279,13 @@ def ensure_user_prompts_initialized(uid: str, *, copy_max: int = 3) -> None:
         pass
 
 
-def ensure_global_docs_dir() -> None:
-    """Legt das zentrale docs/-Verzeichnis an (read-only gedacht)."""
+def ensure_global_docs_dir() -> bool:
+    """Legt das zentrale docs/-Verzeichnis an (read-only gedacht). True bei Erfolg."""
     try:
         DOCS_DIR.mkdir(parents=True, exist_ok=True)
+        return True
     except Exception:
-        pass
+        return False
 
 
 # Verwaiste User-Directories löschen und aus den Secrets entfernen (nächste Methode)
@@ -22,13 +22,17 @@ from __future__ import annotations
 
 import base64
 import ctypes
-import datetime
+import functools
 import hashlib
 import hmac
+import io
 import json
 import os
 import re
+import secrets
 import tempfile
+import threading
+import time
 import unicodedata
 from pathlib import Path
 
@@ -133,6 +137,8 @@ _KEYBOARD_SEQ = (
     "yxcvb",
     "yxcvbn",
 )
+# Alle Walks als eine Alternation → ein einziger Scan statt einer Suche pro Muster
+_KEYBOARD_RE = re.compile("|".join(map(re.escape, _KEYBOARD_SEQ)))
 
 
 def _char_classes(s: str) -> int:
@@ -147,24 +153,16 @@ def _looks_sequential(s: str, min_run: int = 5) -> bool:
     """Einfacher Check auf monotone Läufe (abcde, 12345, 54321)."""
     if len(s) < min_run:
         return False
-    # Vorwärts
-    run = 1
-    for i in range(1, len(s)):
-        if ord(s[i]) - ord(s[i - 1]) == 1:
-            run += 1
-            if run >= min_run:
-                return True
-        else:
-            run = 1
-    # Rückwärts
-    run = 1
-    for i in range(1, len(s)):
-        if ord(s[i - 1]) - ord(s[i]) == 1:
-            run += 1
-            if run >= min_run:
-                return True
-        else:
-            run = 1
+    # Codepoints einmalig bestimmen (ASCII: bytes liefern direkt ints)
+    cps = s.encode("ascii") if s.isascii() else list(map(ord, s))
+    # Vorwärts & Rückwärts in einem Durchlauf
+    fwd = bwd = 1
+    for prev, cur in zip(cps, cps[1:]):
+        d = cur - prev
+        fwd = fwd + 1 if d == 1 else 1
+        bwd = bwd + 1 if d == -1 else 1
+        if fwd >= min_run or bwd >= min_run:
+            return True
     return False
 
 
@@ -203,7 +201,7 @@ def validate_master_password(pw: str) -> tuple[bool, str]:
         return False, "Bekannt schwaches Passwort. Bitte wähle ein stärkeres!"
     if len(set(pw)) == 1:
         return False, "Alle Zeichen identisch."
-    if _looks_sequential(low) or any(k in low for k in _KEYBOARD_SEQ):
+    if _looks_sequential(low) or _KEYBOARD_RE.search(low):
         return False, "Wirkt wie einfache Sequenz/Keyboard-Walk."
     if _char_classes(pw) < 3:
         return (
@@ -217,6 +215,18 @@ def validate_master_password(pw: str) -> tuple[bool, str]:
 # ---------- File I/O helpers for the secrets file ----------
 
 
+_SECRETS_HEADER = (
+    "# =========================================================\n"
+    "# Chatti-Client Secrets File\n"
+    "#\n"
+    "# This file is part of the chatti-client project.\n"
+    "# DO NOT EDIT MANUALLY!\n"
+    "# Changes will be overwritten and may break functionality.\n"
+    "# =========================================================\n"
+    "\n"
+)
+
+
 def _init_secrets_file_if_missing() -> None:
     """
     Legt die chatti-secrets.conf an, falls sie fehlt.
@@ -224,16 +234,18 @@ def _init_secrets_file_if_missing() -> None:
     """
     if SECRETS_FILE.exists():
         return
-    header = (
-        "# =========================================================\n"
-        "# Chatti-Client Secrets File\n"
-        "#\n"
-        "# This file is part of the chatti-client project.\n"
-        "# DO NOT EDIT MANUALLY!\n"
-        "# Changes will be overwritten and may break functionality.\n"
-        "# =========================================================\n"
-    )
-    _write_text(SECRETS_FILE, header + "\n")
+    _write_text(SECRETS_FILE, _SECRETS_HEADER)
+
+
+def secrets_file_is_empty() -> bool:
+    """
+    True, wenn die Secrets-Datei fehlt oder höchstens den Kommentar-Header enthält.
+    Nur ein stat() – kein Lesen/Parsen. False heißt nur „evtl. Einträge vorhanden“.
+    """
+    try:
+        return os.stat(SECRETS_FILE).st_size <= len(_SECRETS_HEADER)
+    except OSError:
+        return True
 
 
 def _read_text(path) -> str:
@@ -246,37 +258,54 @@ def _read_text(path) -> str:
 
 def _write_text(path, text: str) -> None:
     # Ensure parent directory exists and write UTF-8 text atomically enough for our use.
+    global _ACTIVE_UID_CACHE
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(text, encoding="utf-8")
+    # eigene Writes sofort sichtbar machen (mtime-Auflösung kann grob sein)
+    _ACTIVE_UID_CACHE = None
 
 
 def write_secret_kv(key: str, value: str) -> None:
     """
     Set/replace a single `key = value` line inside SECRETS_FILE.
+    Thin wrapper around `_update_secrets()`.
+    """
+    _update_secrets({key: value})
+
 
+def _update_secrets(updates: dict[str, str]) -> None:
+    """
+    Set/replace several `key = value` lines inside SECRETS_FILE at once.
+
+    - Reads and writes the file exactly once, however many keys change.
     - Keeps other lines and comments as-is.
-    - Uses a regex that matches the exact key at line start (ignoring leading spaces),
-      captures the left-hand side (`key = `) so we can re-use it,
-      and replaces the right-hand side with the new value.
-    - Uses a lambda in `re.sub` to avoid unintended backreference expansion in `value`.
+    - Matches the exact key at line start (ignoring surrounding spaces), keeps the
+      left-hand side (`key = `) and replaces only the right-hand side (first hit).
+    - Keys not present yet are appended at the end, in the order given.
     """
     _init_secrets_file_if_missing()
     txt = _read_text(SECRETS_FILE) or "# chatti-secrets.conf\n"
-    pat = re.compile(rf"^(\s*{re.escape(key)}\s*=\s*)(.*)$", re.MULTILINE)
-    if pat.search(txt):
-        # Keep the original "left part" (indent + "key = ") and insert the raw value.
-        # Using lambda prevents `\1`-style backreferences from being interpreted inside `value`.
-        txt = pat.sub(lambda m: m.group(1) + value, txt, count=1)
-    else:
-        # Key not present → append a new line at the end (with a trailing newline).
+    pending = dict(updates)
+    lines = txt.splitlines(True)
+    for i, line in enumerate(lines):
+        if not pending:
+            break
+        left, eq, right = line.partition("=")
+        if not eq or left.strip() not in pending:
+            continue
+        # Original "left part" (indent + "key = ") behalten, Wert roh einsetzen
+        rest = right.lstrip(" \t")
+        pad = right[: len(right) - len(rest)]
+        eol = "\n" if line.endswith("\n") else ""
+        lines[i] = f"{left}={pad}{pending.pop(left.strip())}{eol}"
+    txt = "".join(lines)
+    if pending:
+        # Keys not present → append new lines at the end (with a trailing newline).
         if not txt.endswith("\n"):
             txt += "\n"
-        txt += f"{key} = {value}\n"
+        txt += "".join(f"{k} = {v}\n" for k, v in pending.items())
     _write_text(SECRETS_FILE, txt)
-    try:
-        os.chmod(SECRETS_FILE, 0o600)
-    except Exception:
-        pass
+    _chmod_600(SECRETS_FILE)
 
 
 def redact(s: str, keep: int = 4) -> str:
@@ -355,31 +384,39 @@ def reset_secrets(mode: str = "soft") -> None:
         print(f"• Secrets file ist leer oder fehlt: \033[90m{SECRETS_FILE}\033[0m")
         return
 
-    lines_out = []
-    for line in txt.splitlines():
+    buf = io.StringIO()
+    for line in txt.splitlines(True):
         raw = line.strip()
-        if not raw or raw.startswith("#") or raw.startswith(";"):
-            lines_out.append(line)
-            continue
-        if "=" not in raw:
-            lines_out.append(line)
-            continue
-        k, _ = raw.split("=", 1)
-        if k.strip() in RESET_KEYS:
-            # skip (removes this key)
-            continue
-        lines_out.append(line)
+        if raw and raw[0] not in "#;" and "=" in raw:
+            if raw.split("=", 1)[0].strip() in RESET_KEYS:
+                # skip (removes this key)
+                continue
+        buf.write(line)
 
-    new_txt = "\n".join(lines_out).rstrip() + "\n"
+    new_txt = buf.getvalue().rstrip() + "\n"
     _write_text(SECRETS_FILE, new_txt)
 
-    try:
-        os.chmod(SECRETS_FILE, 0o600)
-    except Exception:
-        pass
+    _chmod_600(SECRETS_FILE)
     print(f"✓ Secrets reset (soft) written to {SECRETS_FILE}")
 
 
+# ---------- Random bytes for salts / uids ----------
+# Ein CSPRNG-Puffer, der blockweise nachgefüllt wird: spart bei Bulk-Anlagen
+# (mehrere User/Salts) den getrandom-Syscall pro Aufruf.
+_RAND_BUF = bytearray()
+_RAND_LOCK = threading.Lock()
+_RAND_REFILL = 1024
+
+
+def _rand(n: int) -> bytes:
+    with _RAND_LOCK:
+        if len(_RAND_BUF) < n:
+            _RAND_BUF.extend(secrets.token_bytes(max(n, _RAND_REFILL)))
+        out = bytes(_RAND_BUF[:n])
+        del _RAND_BUF[:n]
+    return out
+
+
 # ---------- PBKDF2-based KDF & Fernet encryption helpers ----------
 def _derive_key(password: str, salt: bytes, iterations: int = 200_000) -> bytes:
     """
@@ -413,7 +450,7 @@ def encrypt_api_key(
     - The salt is returned base64-encoded (to store in text files).
     """
     if salt is None:
-        salt = os.urandom(16)
+        salt = _rand(16)
     f = Fernet(_derive_key(password, salt))
     token = f.encrypt(plaintext_key.encode("utf-8"))
     return token.decode("utf-8"), base64.b64encode(salt).decode("utf-8")
@@ -459,23 +496,25 @@ def decrypt_api_key(ciphertext_b64: str, password: str, salt_b64: str) -> str:
 #     (re.compile(r"\b[A-Za-z0-9_\-]{40,}\b"), "***"),
 # ]
 
-# Sammle typische Muster:
-_RE = [
+# Sammle typische Muster (eine Alternation → ein einziger Scan pro String):
+_RE_ANY = re.compile(
     # OpenAI Keys: sk-... (live & legacy)
-    (re.compile(r"\bsk-(?:live|test)?[A-Za-z0-9]{20,}\b"), "sk-***"),
+    r"\b(?:sk-(?:live|test)?[A-Za-z0-9]{20,}"
     # Fernet-Token (beginnen oft mit gAAAAA, sind lang & base64-url)
-    (re.compile(r"\bgAAAAA[A-Za-z0-9_\-]{20,}\b"), "FERNET-***"),
-]
+    r"|gAAAAA[A-Za-z0-9_\-]{20,})\b"
+)
+
+
+def _mask_repl(m: re.Match) -> str:
+    # Ersatz anhand des Präfixes wählen
+    return "sk-***" if m.group(0).startswith("sk-") else "FERNET-***"
 
 
 def mask_secrets(s: str) -> str:
     """Maskiert häufige Secret-/Tokenmuster in s."""
     if not isinstance(s, str) or not s:
         return s
-    out = s
-    for rx, repl in _RE:
-        out = rx.sub(repl, out)
-    return out
+    return _RE_ANY.sub(_mask_repl, s)
 
 
 # =========================================================================
@@ -511,18 +550,17 @@ def get_active_user_display(master: str | None = None) -> tuple[str | None, str
 
 
 def _now_iso() -> str:
-    return datetime.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+_WS_RE = re.compile(r"\s+")
 
 
+@functools.lru_cache(maxsize=256)
 def _norm_user(u: str) -> str:
-    # Unicode robust machen
-    u = unicodedata.normalize("NFKC", u)
-    # Rand-Whitespace weg
-    u = u.strip()
-    # Innen-Whitespace auf ein einzelnes Space reduzieren
-    u = " ".join(u.split())
-    # Case-insensitive Vergleich
-    return u.casefold()
+    # Unicode robust machen, Rand-Whitespace weg,
+    # Innen-Whitespace auf ein einzelnes Space reduzieren, case-insensitive
+    return _WS_RE.sub(" ", unicodedata.normalize("NFKC", u).strip()).casefold()
 
 
 def _derive_key_raw(password: str, salt: bytes, iterations: int = 200_000) -> bytes:
@@ -543,24 +581,25 @@ def _b64d_u(s: str) -> bytes:
 def _field_fernet(base_raw32: bytes, uid_b64u: str, field: str) -> Fernet:
     # Feld- & UID-gebundener Schlüssel; kein Klartextname nötig
     msg = ("chatti|v2|uid:" + uid_b64u + "|field:" + field).encode("utf-8")
-    digest = hmac.new(base_raw32, msg, hashlib.sha256).digest()
-    return Fernet(base64.urlsafe_b64encode(digest))
+    # hmac.digest: One-Shot in C, ohne HMAC-Objekt pro Aufruf
+    return Fernet(base64.urlsafe_b64encode(hmac.digest(base_raw32, msg, "sha256")))
 
 
 def _new_uid() -> str:
     # 16B zufällig, urlsafe, **ohne '='** (nur für UID!):
     # verhindert Parser-Konflikte in 'key = value' Zeilen - sonst bricht read_secrets an 'key = value'
-    return base64.urlsafe_b64encode(os.urandom(16)).decode("ascii").rstrip("=")
+    return base64.urlsafe_b64encode(_rand(16)).decode("ascii").rstrip("=")
 
 
 def _users_in_file(sec: dict[str, str]) -> list[str]:
     # sammelt alle user.<uid>.<field> → liefert sortierte uid-Liste
     uids = set()
     for k in sec.keys():
-        if k.startswith("user.") and k.count(".") >= 2:
-            parts = k.split(".")
-            if len(parts) >= 3:
-                uids.add(parts[1])
+        if k.startswith("user."):
+            # ein einziger Scan statt count(".") + split(".")
+            uid, sep, _ = k[5:].partition(".")
+            if sep:
+                uids.add(uid)
     return sorted(uids)
 
 
@@ -578,7 +617,7 @@ def add_user(uid_display_name: str, master_password: str, api_key: str) -> str:
     is_first_user = len(pre_uids) == 0
 
     uid = _new_uid()
-    salt = os.urandom(16)
+    salt = _rand(16)
     base_raw = _derive_key_raw(master_password, salt)
 
     f_user = _field_fernet(base_raw, uid, "username")
@@ -587,20 +626,23 @@ def add_user(uid_display_name: str, master_password: str, api_key: str) -> str:
     token_user = f_user.encrypt(uid_display_name.encode("utf-8")).decode("utf-8")
     token_key = f_key.encrypt(api_key.encode("utf-8")).decode("utf-8")
 
-    write_secret_kv("version", "2")
-    write_secret_kv(f"user.{uid}.kdf_salt", _b64u(salt))
-    write_secret_kv(f"user.{uid}.username_enc", token_user)
-    write_secret_kv(f"user.{uid}.api_key_enc", token_key)
-    write_secret_kv(f"user.{uid}.updated_at", _now_iso())
-    write_secret_kv("user.active", uid)
+    updates = {
+        "version": "2",
+        f"user.{uid}.kdf_salt": _b64u(salt),
+        f"user.{uid}.username_enc": token_user,
+        f"user.{uid}.api_key_enc": token_key,
+        f"user.{uid}.updated_at": _now_iso(),
+        "user.active": uid,
+    }
+    # --- NEU: erster User wird automatisch Admin ---
+    if is_first_user:
+        updates[f"user.{uid}.is_admin"] = "1"
+    # alles in einem Schreibvorgang
+    _update_secrets(updates)
 
     # Verzeichnis-/Dateistruktur für den User anlegen
     _touch_user_files(uid)
 
-    # --- NEU: erster User wird automatisch Admin ---
-    if is_first_user:
-        set_admin(uid, True)
-
     return uid
 
 
@@ -617,9 +659,8 @@ def get_admin_uids() -> list[str]:
     uids = set()
     for k, v in sec.items():
         if k.startswith("user.") and k.endswith(".is_admin"):
-            uid = k.split(".")[1]
             if str(v).strip() in ("1", "true", "yes"):
-                uids.add(uid)
+                uids.add(k[5:].partition(".")[0])
     return sorted(uids)
 
 
@@ -631,8 +672,10 @@ def set_admin(uid: str, value: bool) -> None:
 
 
 def _chmod_600(path: Path) -> None:
+    # chmod nur, wenn nötig (spart den Syscall bei wiederholten Writes)
     try:
-        os.chmod(path, 0o600)
+        if os.stat(path).st_mode & 0o777 != 0o600:
+            os.chmod(path, 0o600)
     except Exception:
         pass
 
@@ -756,10 +799,24 @@ def load_secrets() -> dict[str, str]:
     return sec
 
 
+# (st_mtime_ns, st_size, uid) – zuletzt gelesener user.active-Wert
+_ACTIVE_UID_CACHE: tuple[int, int, str | None] | None = None
+
+
 def get_active_uid() -> str | None:
+    global _ACTIVE_UID_CACHE
+    try:
+        st = os.stat(SECRETS_FILE)
+    except OSError:
+        return None
+    # Secrets-Datei unverändert → user.active nicht erneut parsen
+    c = _ACTIVE_UID_CACHE
+    if c is not None and c[0] == st.st_mtime_ns and c[1] == st.st_size:
+        return c[2]
     sec = read_secrets()
-    uid = (sec.get("user.active") or "").strip()
-    return uid or None
+    uid = (sec.get("user.active") or "").strip() or None
+    _ACTIVE_UID_CACHE = (st.st_mtime_ns, st.st_size, uid)
+    return uid
 
 
 def list_users_decrypted(master_password: str) -> list[tuple[str, str]]:
@@ -807,52 +864,36 @@ def remove_user_entry_by_uid(uid: str) -> None:
     if not txt:
         return
 
-    lines = txt.splitlines()
+    # Ein Durchlauf: filtern, verbleibende UIDs sammeln, user.active merken
+    prefix = f"user.{uid}."
     out: list[str] = []
-    for line in lines:
+    remaining_uids: set[str] = set()
+    active_idx: int | None = None
+    for line in txt.splitlines(True):
         raw = line.strip()
-        if not raw or raw.startswith("#") or raw.startswith(";"):
-            out.append(line)
-            continue
-        if "=" not in raw:
-            out.append(line)
-            continue
-        k, _ = raw.split("=", 1)
-        k = k.strip()
         # user.<uid>.<field> → überspringen (löschen)
-        if k.startswith(f"user.{uid}."):
+        if raw.startswith(prefix):
             continue
         out.append(line)
-
-    # user.active ggf. anpassen
-    sec_after = {}
-    for line in out:
-        raw = line.strip()
-        if not raw or raw.startswith("#") or raw.startswith(";") or "=" not in raw:
+        if not raw or raw[0] in "#;" or "=" not in raw:
             continue
         k, v = raw.split("=", 1)
-        sec_after[k.strip()] = v.strip()
-
-    if sec_after.get("user.active") == uid:
-        # nächste vorhandene UID wählen oder leeren
-        remaining_uids = _users_in_file(sec_after)
-        new_active = remaining_uids[0] if remaining_uids else ""
-        # ersetze/füge user.active Zeile
-        replaced = False
-        for i, line in enumerate(out):
-            if line.strip().startswith("user.active"):
-                out[i] = f"user.active = {new_active}"
-                replaced = True
-                break
-        if not replaced:
-            out.append(f"user.active = {new_active}")
-
-    new_txt = "\n".join(out).rstrip() + "\n"
-    _write_text(SECRETS_FILE, new_txt)
-    try:
-        os.chmod(SECRETS_FILE, 0o600)
-    except Exception:
-        pass
+        k = k.strip()
+        if k == "user.active":
+            active_idx = len(out) - 1 if v.strip() == uid else None
+        elif k.startswith("user."):
+            other, sep, _ = k[5:].partition(".")
+            if sep:
+                remaining_uids.add(other)
+
+    # user.active ggf. anpassen: nächste vorhandene UID wählen oder leeren
+    if active_idx is not None:
+        new_active = min(remaining_uids) if remaining_uids else ""
+        out[active_idx] = f"user.active = {new_active}\n"
+
+    new_txt = "".join(out)
+    _write_text(SECRETS_FILE, new_txt.rstrip() + "\n")
+    _chmod_600(SECRETS_FILE)
 
 
 def get_api_key_by_uid(uid: str, master_password: str) -> str:
@@ -977,6 +1018,12 @@ def derive_history_key(master: str, salt_bytes: bytes) -> bytes:
 
 ADMIN_PIN_FILE = Path.home() / ".config" / "chatti-cli" / "admin_pin.json"
 
+# Kurzlebiger Cache erfolgreicher PIN-Prüfungen: HMAC(salt, pin) → Zeitpunkt (monotonic).
+# Erspart die erneute scrypt-Ableitung, wenn derselbe korrekte PIN kurz darauf
+# nochmals geprüft wird. Falsche PINs werden nie gecacht (jede Fehleingabe kostet scrypt).
+_VERIFY_CACHE: dict[bytes, float] = {}
+_VERIFY_CACHE_TTL = 60.0
+
 
 def _ensure_parents_secure(p: Path) -> None:
     p.parent.mkdir(parents=True, exist_ok=True)
@@ -988,19 +1035,18 @@ def _ensure_parents_secure(p: Path) -> None:
 
 def _write_json_atomic_secure(path: Path, data: dict) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    # Atomic Write
-    with tempfile.NamedTemporaryFile(
-        "w", encoding="utf-8", delete=False, dir=str(path.parent)
-    ) as tmp:
-        json.dump(data, tmp, ensure_ascii=False)
-        tmp.flush()
-        os.fsync(tmp.fileno())
-        tmp_name = tmp.name
-    os.replace(tmp_name, path)
+    # Atomic Write: Temp-Datei direkt mit 0600 anlegen (ein open, kein Namens-Probing)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    fd = os.open(str(tmp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
     # Rechte/Hidden
     try:
         if os.name != "nt":
-            os.chmod(path, 0o600)
+            _chmod_600(path)  # nur stat, solange die Temp-Datei schon 0600 war
         else:
             try:
                 FILE_ATTRIBUTE_HIDDEN = 0x2
@@ -1019,16 +1065,15 @@ def _read_json_or_empty(path: Path) -> dict:
         return {}
 
 
+_USER_KEY_RE = re.compile(r"user\.([^.]+)\.")
+
+
 def count_users_in_secrets() -> int:
     """
     Zählt eindeutige UIDs in den Secrets (Keys: user.<UID>.*).
     """
     sec = load_secrets()
-    uids: set[str] = set()
-    for k in sec.keys():
-        if k.startswith("user.") and k.count(".") >= 2:
-            uids.add(k.split(".", 2)[1])
-    return len(uids)
+    return len({m.group(1) for k in sec if (m := _USER_KEY_RE.match(k))})
 
 
 def has_any_user() -> bool:
@@ -1036,29 +1081,47 @@ def has_any_user() -> bool:
     return count_users_in_secrets() > 0
 
 
+# (st_mtime_ns, Ergebnis) der letzten Plausibilitätsprüfung von admin_pin.json
+_ADMIN_PIN_CACHE: tuple[int, bool] | None = None
+
+
 def has_admin_pin() -> bool:
     """True, wenn admin_pin.json existiert und plausibel (salt/hash b64, Parameter vorhanden)."""
+    global _ADMIN_PIN_CACHE
+    try:
+        st = os.stat(ADMIN_PIN_FILE)
+    except OSError:
+        _ADMIN_PIN_CACHE = None
+        return False
+    # Datei unverändert → Ergebnis der letzten Prüfung wiederverwenden (nur ein stat)
+    if _ADMIN_PIN_CACHE is not None and _ADMIN_PIN_CACHE[0] == st.st_mtime_ns:
+        return _ADMIN_PIN_CACHE[1]
+    ok = _admin_pin_file_plausible()
+    _ADMIN_PIN_CACHE = (st.st_mtime_ns, ok)
+    return ok
+
+
+def _invalidate_admin_pin_cache() -> None:
+    global _ADMIN_PIN_CACHE, _PIN_PARAMS_CACHE
+    _ADMIN_PIN_CACHE = None
+    _PIN_PARAMS_CACHE = None
+
+
+_B64_RE = re.compile(r"[A-Za-z0-9+/]+={0,2}")
+
+
+def _admin_pin_file_plausible() -> bool:
     try:
-        if not ADMIN_PIN_FILE.exists():
-            return False
         data = _read_json_or_empty(ADMIN_PIN_FILE)
         # Pflichtfelder prüfen
         for k in ("salt", "hash", "n", "r", "p"):
             if k not in data:
                 return False
-        # b64 Plausibilität
-        try:
-            base64.b64decode((data["salt"] or "").encode("ascii"))
-            base64.b64decode((data["hash"] or "").encode("ascii"))
-        except Exception:
-            return False
-        # Parameter
-        n = int(data["n"])
-        r = int(data["r"])
-        p = int(data["p"])
-        if n <= 0 or r <= 0 or p <= 0:
+        # b64 Plausibilität (Alphabet/Padding prüfen statt zu dekodieren)
+        if not (_B64_RE.fullmatch(data["salt"]) and _B64_RE.fullmatch(data["hash"])):
             return False
-        return True
+        # Parameter (JSON liefert Zahlen bereits als int)
+        return all(isinstance(data[k], int) and data[k] > 0 for k in ("n", "r", "p"))
     except Exception:
         return False
 
@@ -1098,7 +1161,7 @@ def set_admin_pin(pin: str) -> None:
 
     _ensure_parents_secure(ADMIN_PIN_FILE)
     try:
-        salt = os.urandom(16)
+        salt = _rand(16)
         h = hashlib.scrypt(pin.encode("utf-8"), salt=salt, n=2**14, r=8, p=1, dklen=32)
         data = {
             "salt": base64.b64encode(salt).decode("ascii"),
@@ -1111,6 +1174,9 @@ def set_admin_pin(pin: str) -> None:
         _write_json_atomic_secure(ADMIN_PIN_FILE, data)
     except Exception as e:
         raise RuntimeError(f"Admin-PIN konnte nicht gespeichert werden: {type(e).__name__}: {e}")
+    finally:
+        _VERIFY_CACHE.clear()
+        _invalidate_admin_pin_cache()
 
 
 def validate_admin_secret(pw: str) -> tuple[bool, str]:
@@ -1121,17 +1187,49 @@ def validate_admin_secret(pw: str) -> tuple[bool, str]:
     return validate_master_password(pw)
 
 
+# (st_mtime_ns, (salt, hash, n, r, p, dklen)) – geparste admin_pin.json
+_PIN_PARAMS_CACHE: tuple[int, tuple[bytes, bytes, int, int, int, int]] | None = None
+
+
+def _load_pin_params() -> tuple[bytes, bytes, int, int, int, int] | None:
+    """Liest & dekodiert admin_pin.json einmal pro Dateistand (mtime)."""
+    global _PIN_PARAMS_CACHE
+    st = os.stat(ADMIN_PIN_FILE)
+    if _PIN_PARAMS_CACHE is not None and _PIN_PARAMS_CACHE[0] == st.st_mtime_ns:
+        return _PIN_PARAMS_CACHE[1]
+    data = _read_json_or_empty(ADMIN_PIN_FILE)
+    if not data:
+        return None
+    params = (
+        base64.b64decode(data["salt"]),
+        base64.b64decode(data["hash"]),
+        int(data["n"]),
+        int(data["r"]),
+        int(data["p"]),
+        int(data.get("dklen", 32)),
+    )
+    _PIN_PARAMS_CACHE = (st.st_mtime_ns, params)
+    return params
+
+
 def verify_admin_pin(pin: str) -> bool:
     try:
-        data = _read_json_or_empty(ADMIN_PIN_FILE)
-        if not data:
+        params = _load_pin_params()
+        if params is None:
             return False
-        salt = base64.b64decode(data["salt"])
-        expect = base64.b64decode(data["hash"])
-        n, r, p = int(data["n"]), int(data["r"]), int(data["p"])
-        dklen = int(data.get("dklen", 32))
-        h = hashlib.scrypt(pin.encode("utf-8"), salt=salt, n=n, r=r, p=p, dklen=dklen)
-        return h == expect
+        salt, expect, n, r, p, dklen = params
+        pin_b = pin.encode("utf-8")
+        ck = hmac.digest(salt, expect + pin_b, "sha256")
+        ts = _VERIFY_CACHE.get(ck)
+        if ts is not None and time.monotonic() - ts < _VERIFY_CACHE_TTL:
+            return True
+        # scrypt bleibt bewusst im Prüfpfad: ein schneller Prüf-Tag in der JSON-Datei wäre
+        # auch für Offline-Angreifer eine Abkürzung. Wiederholungen deckt _VERIFY_CACHE ab.
+        h = hashlib.scrypt(pin_b, salt=salt, n=n, r=r, p=p, dklen=dklen)
+        if not hmac.compare_digest(h, expect):
+            return False
+        _VERIFY_CACHE[ck] = time.monotonic()
+        return True
     except Exception:
         return False
 
@@ -1,18 +1,26 @@
 # === ticket.py
 #
-from datetime import datetime
+import os
+import stat
+import time
 from pathlib import Path
 
 from core.paths import USERS_DATA_DIR, user_ticket_file
 
+_FIRST_LINE_MAX = 512  # Bytes, die collect_tickets() für die Vorschauzeile liest
+
+
+def _utc_stamp_bytes() -> bytes:
+    """UTC-Zeitstempel als b"YYYY-MM-DDTHH:MM:SSZ" (ohne datetime-Objekt)."""
+    return b"%04d-%02d-%02dT%02d:%02d:%02dZ" % time.gmtime()[:6]
+
 
 def append_ticket(uid: str, text: str) -> Path:
     """Hängt eine Zeile mit Zeitstempel an ticket.txt an (wird erstellt, falls fehlend)."""
-    p = user_ticket_file(uid)
-    ts = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-    line = f"[{ts}] {text.strip()}\n"
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open("a", encoding="utf-8") as f:
+    # user_ticket_file() liefert den support/-Ordner (legt ihn an)
+    p = user_ticket_file(uid) / "ticket.txt"
+    line = b"[" + _utc_stamp_bytes() + b"] " + text.strip().encode("utf-8") + b"\n"
+    with p.open("ab") as f:
         f.write(line)
     return p
 
@@ -24,20 +32,31 @@ def collect_tickets() -> list[tuple[str, Path, str]]:
     """
     out = []
     try:
-        if USERS_DATA_DIR.exists():
-            for child in USERS_DATA_DIR.iterdir():
-                if not child.is_dir():
+        with os.scandir(USERS_DATA_DIR) as it:
+            for entry in it:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                uid = entry.name
+                p = Path(entry.path) / "support" / "ticket.txt"
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                if not stat.S_ISREG(st.st_mode):
                     continue
-                uid = child.name
-                p = child / "support" / "ticket.txt"
-                if p.exists() and p.is_file():
-                    first = ""
+                first = ""
+                if st.st_size:
+                    # nur den Anfang lesen – reicht für die erste Zeile
                     try:
-                        with p.open("r", encoding="utf-8") as f:
-                            first = (f.readline() or "").rstrip("\n")
+                        fd = os.open(p, os.O_RDONLY)
+                        try:
+                            buf = os.read(fd, _FIRST_LINE_MAX)
+                        finally:
+                            os.close(fd)
+                        first = buf.split(b"\n", 1)[0].decode("utf-8", "replace").rstrip("\r")
                     except Exception:
                         pass
-                    out.append((uid, p, first))
+                out.append((uid, p, first))
     except Exception:
         pass
     return sorted(out, key=lambda t: t[0])
@@ -1,21 +1,41 @@
 # core/usage.py
 from __future__ import annotations
 
+import atexit
 import calendar
 import datetime as dt
 import json
 import os
+import shutil
 import sys
+import threading
 import time
 from collections import defaultdict
 from pathlib import Path
 
-from core.paths import user_data_dir
+from core.paths import USERS_DATA_DIR, _ensure_dir_secure, user_data_dir
 from core.security import get_active_uid
 
+# Optional: orjson (C-Extension) für die JSONL-Hotpaths, sonst stdlib-json
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+except Exception:
+    _loads = json.loads
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
 _USAGE_FN = "usage.jsonl"
 _PRUNE_MARK = ".usage_prune_ts"
 _PRUNE_INTERVAL_SEC = 6 * 3600  # höchstens alle 6h kürzen
+_READ_CHUNK = 64 * 1024  # Blockgröße fürs Rückwärtslesen
 
 API_BASE = os.getenv("OPENAI_BASE_URL", "https://api.openai.com")
 API_KEY = os.getenv("OPENAI_API_KEY")  # Pflicht
@@ -26,18 +46,68 @@ def _now_ts() -> int:
     return int(time.time())
 
 
+# Verzeichnisse, die in diesem Prozess bereits angelegt/geprüft wurden
+_ENSURED_DIRS: set[str] = set()
+
+
+def _ensure_dir(d: Path) -> None:
+    s = str(d)
+    if s in _ENSURED_DIRS:
+        return
+    _ensure_dir_secure(d)
+    _ENSURED_DIRS.add(s)
+
+
+# (uid, Pfad) des zuletzt aufgelösten Usage-Logs
+_UPATH_CACHE: tuple[str, Path] | None = None
+
+
 def _usage_path(uid: str | None = None) -> Path:
+    global _UPATH_CACHE
     u = uid or get_active_uid()
     if not u:
         raise RuntimeError("Kein aktiver Benutzer für Usage-Log.")
-    d = user_data_dir(u)
-    d.mkdir(parents=True, exist_ok=True)
-    return d / _USAGE_FN
+    if _UPATH_CACHE is not None and _UPATH_CACHE[0] == u:
+        return _UPATH_CACHE[1]
+    d = USERS_DATA_DIR / u
+    _ensure_dir(d)
+    p = d / _USAGE_FN
+    _UPATH_CACHE = (u, p)
+    return p
+
+
+def _iter_lines_reversed(path: Path, chunk_size: int = _READ_CHUNK):
+    """Liefert die Zeilen einer Datei (bytes, ohne Zeilenumbruch) vom Dateiende her."""
+    with path.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        tail = b""
+        while pos > 0:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + tail).split(b"\n")
+            # erste Zeile des Blocks ist evtl. unvollständig → mit nächstem Block verbinden
+            tail = lines.pop(0)
+            yield from reversed(lines)
+        yield tail
+
+
+# Schreibpuffer: Records werden gesammelt und blockweise angehängt.
+# Annahme: pro User-Log schreibt nur *ein* Prozess. Ein Block landet erst beim
+# Flush im Log – schreiben zwei Prozesse dieselbe Datei, kann die ts-Reihenfolge
+# springen (sum_month/_find_cutoff_offset setzen aufsteigende ts voraus).
+# Ungeflushte Records gehen verloren, wenn atexit nicht läuft (SIGHUP, SIGKILL).
+_FLUSH_MAX_RECORDS = 32
+_FLUSH_MAX_AGE_SEC = 5.0
+_PENDING: dict[Path, list[bytes]] = {}
+_PENDING_COUNT = 0
+_LAST_FLUSH = time.monotonic()
+_PENDING_LOCK = threading.Lock()
 
 
 def append_usage(usage: dict, uid: str | None = None) -> None:
+    global _PENDING_COUNT
     path = _usage_path(uid)
-    was_new = not path.exists()
     rec = {
         "ts": _now_ts(),
         "model": usage.get("model", ""),
@@ -45,15 +115,59 @@ def append_usage(usage: dict, uid: str | None = None) -> None:
         "output_tokens": int(usage.get("output_tokens", 0) or 0),
         "total_tokens": int(usage.get("total_tokens", 0) or 0),
     }
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-    if was_new:
-        try:
-            os.chmod(path, 0o600)
-        except Exception:
-            pass
+    line = _dumps(rec)
+    with _PENDING_LOCK:
+        _PENDING.setdefault(path, []).append(line)
+        _PENDING_COUNT += 1
+        due = (
+            _PENDING_COUNT >= _FLUSH_MAX_RECORDS
+            or time.monotonic() - _LAST_FLUSH >= _FLUSH_MAX_AGE_SEC
+        )
+    if due:
+        flush_usage()
+    _schedule_prune()
+
+
+def flush_usage() -> None:
+    """Schreibt gepufferte Usage-Records (ein append-Write pro Datei)."""
+    global _PENDING_COUNT, _LAST_FLUSH
+    with _PENDING_LOCK:
+        for path, lines in _PENDING.items():
+            was_new = not path.exists()
+            # O_APPEND: ein einzelner write() landet atomar am Dateiende
+            with path.open("ab") as f:
+                f.write(b"\n".join(lines) + b"\n")
+            if was_new:
+                try:
+                    os.chmod(path, 0o600)
+                except Exception:
+                    pass
+        _PENDING.clear()
+        _PENDING_COUNT = 0
+        _LAST_FLUSH = time.monotonic()
+
+
+atexit.register(flush_usage)
+
+
+# Zeitpunkt (monotonic) des letzten im Hintergrund gestarteten Prunes
+_PRUNE_SCHEDULED_AT: float | None = None
+
+
+def _schedule_prune() -> None:
+    """
+    Startet prune_usage_log() in einem Daemon-Thread – höchstens einmal pro
+    _PRUNE_INTERVAL_SEC und Prozess. So bleiben Markerdatei, Config-Load und
+    Scan aus dem Schreibpfad von append_usage heraus.
+    """
+    global _PRUNE_SCHEDULED_AT
+    now = time.monotonic()
+    if _PRUNE_SCHEDULED_AT is not None and now - _PRUNE_SCHEDULED_AT < _PRUNE_INTERVAL_SEC:
+        return
+    _PRUNE_SCHEDULED_AT = now
     try:
-        prune_usage_log()  # nutzt Config + Throttle intern
+        # nutzt Config + Throttle intern, fängt eigene Fehler ab
+        threading.Thread(target=prune_usage_log, name="usage-prune", daemon=True).start()
     except Exception:
         pass
 
@@ -63,7 +177,10 @@ def prune_usage_log(keep_days: int | None = None, *, throttle: bool = True) -> i
     Schneidet usage.jsonl auf die letzten `keep_days` zu.
     - Wenn keep_days=None: Wert aus Config (usage_keep_days, Default 120)
     - throttle=True: höchstens alle _PRUNE_INTERVAL_SEC Sekunden (per Markerdatei)
-    Gibt die Anzahl der behaltenen Zeilen zurück (nur grob informativ).
+    Gibt die Anzahl der behaltenen Bytes zurück (nur grob informativ).
+
+    Da das Log append-only ist (ts aufsteigend), wird die Schnittstelle per
+    Binärsuche über Byte-Offsets gefunden und der Rest am Stück kopiert.
     """
     try:
         uid = get_active_uid()
@@ -100,29 +217,23 @@ def prune_usage_log(keep_days: int | None = None, *, throttle: bool = True) -> i
         cutoff = int(time.time()) - keep_days * 24 * 3600
         tmp = p.with_suffix(".jsonl.tmp")
 
-        kept = 0
-        total = 0
-        with (
-            p.open("r", encoding="utf-8") as fin,
-            tmp.open("w", encoding="utf-8") as fout,
-        ):
-            for line in fin:
-                total += 1
-                try:
-                    rec = json.loads(line)
-                    ts = int(rec.get("ts", 0))
-                except Exception:
-                    # defekte Zeilen verwerfen
-                    continue
-                if ts >= cutoff:
-                    fout.write(line)
-                    kept += 1
-
-        # atomar ersetzen
-        tmp.replace(p)
+        # Lock bis zum replace halten: ein paralleles flush_usage() würde sonst
+        # hinter die bereits kopierte Stelle schreiben und mit ersetzt werden
+        with _PENDING_LOCK:
+            with p.open("rb") as fin:
+                size = fin.seek(0, os.SEEK_END)
+                offset = _find_cutoff_offset(fin, size, cutoff)
+                kept = size - offset
+                if offset == 0:
+                    return kept  # nichts zu kürzen → Datei bleibt unangetastet
+                with tmp.open("wb") as fout:
+                    _copy_tail(fin, fout, offset, kept)
+
+            # atomar ersetzen
+            tmp.replace(p)
 
         # Marker aktualisieren NUR wenn gekürzt wurde
-        if throttle and kept < total:
+        if throttle:
             try:
                 mark.write_text(str(int(time.time())), encoding="utf-8")
                 os.chmod(mark, 0o600)
@@ -135,12 +246,86 @@ def prune_usage_log(keep_days: int | None = None, *, throttle: bool = True) -> i
         return 0
 
 
+_TS_PREFIX = b'{"ts":'
+
+
+def _peek_ts(line: bytes) -> int | None:
+    """
+    Liest ts direkt aus dem Zeilenpräfix, das append_usage schreibt
+    ({"ts": 123, … bzw. {"ts":123, …). None, wenn das Präfix nicht passt.
+    """
+    if line.startswith(_TS_PREFIX):
+        end = line.find(b",", len(_TS_PREFIX))
+        if end > 0:
+            try:
+                return int(line[len(_TS_PREFIX) : end])
+            except ValueError:
+                pass
+    return None
+
+
+def _ts_from(f, pos: int) -> int:
+    """ts des ersten gültigen Eintrags ab der Zeile, die bei/nach `pos` beginnt."""
+    f.seek(_line_start(f, pos))
+    for line in f:
+        ts = _peek_ts(line)
+        if ts is not None:
+            return ts
+        try:
+            return int(_loads(line).get("ts", 0) or 0)
+        except Exception:
+            continue  # defekte Zeile → nächste nehmen
+    return sys.maxsize  # EOF
+
+
+def _line_start(f, pos: int) -> int:
+    """Offset des ersten Zeilenanfangs bei oder nach `pos`."""
+    if pos <= 0:
+        return 0
+    f.seek(pos - 1)
+    f.readline()
+    return f.tell()
+
+
+def _find_cutoff_offset(f, size: int, cutoff: int) -> int:
+    """
+    Byte-Offset der ersten Zeile mit ts >= cutoff (Binärsuche, O(log size) Zeilen).
+    Setzt aufsteigende ts voraus (ein Schreiber pro Log, siehe _PENDING).
+    """
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _ts_from(f, mid) >= cutoff:
+            hi = mid
+        else:
+            lo = mid + 1
+    return _line_start(f, lo)
+
+
+def _copy_tail(fin, fout, offset: int, count: int) -> None:
+    """Kopiert `count` Bytes ab `offset` – per sendfile, wo verfügbar."""
+    try:
+        while count > 0:
+            sent = os.sendfile(fout.fileno(), fin.fileno(), offset, count)
+            if sent == 0:
+                break
+            offset += sent
+            count -= sent
+        if count == 0:
+            return
+    except (AttributeError, OSError):
+        pass  # kein sendfile (Windows/macOS) → Fallback
+    fin.seek(offset)
+    shutil.copyfileobj(fin, fout)
+
+
 def sum_month(uid: str | None = None, *, month_start_day: int = 1) -> tuple[int, int, int]:
     """
     Summiert input/output/total für den laufenden Abrechnungsmonat (einfacher Cut: ab month_start_day).
     Robust auch für 29/30/31 in kürzeren Monaten.
     """
     path = _usage_path(uid)
+    flush_usage()  # gepufferte Records mitzählen
     if not path.exists():
         return (0, 0, 0)
 
@@ -162,20 +347,31 @@ def sum_month(uid: str | None = None, *, month_start_day: int = 1) -> tuple[int,
     start_dt = dt.datetime(year, month, start_day, 0, 0, 0)
     start_ts = int(start_dt.timestamp())
 
+    # Log ist append-only (ts aufsteigend, ein Schreiber – siehe _PENDING) → vom Ende
+    # her lesen und beim ersten Eintrag vor dem Stichtag aufhören, statt die ganze
+    # Historie zu parsen.
     s_in = s_out = s_tot = 0
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rec = json.loads(line)
-            except Exception:
-                continue
-            if int(rec.get("ts", 0) or 0) >= start_ts:
-                s_in += int(rec.get("input_tokens", 0) or 0)
-                s_out += int(rec.get("output_tokens", 0) or 0)
-                s_tot += int(rec.get("total_tokens", 0) or 0)
+    for line in _iter_lines_reversed(path):
+        line = line.strip()
+        if not line:
+            continue
+        # ts möglichst ohne JSON-Parse lesen; ältere Einträge gar nicht erst parsen
+        ts = _peek_ts(line)
+        if ts is not None and 0 < ts < start_ts:
+            break
+        try:
+            rec = _loads(line)
+            if ts is None:
+                ts = int(rec.get("ts", 0) or 0)
+        except Exception:
+            continue
+        if ts < start_ts:
+            if ts > 0:
+                break
+            continue  # Eintrag ohne ts → überspringen
+        s_in += int(rec.get("input_tokens", 0) or 0)
+        s_out += int(rec.get("output_tokens", 0) or 0)
+        s_tot += int(rec.get("total_tokens", 0) or 0)
     return (s_in, s_out, s_tot)
 
 
@@ -183,17 +379,66 @@ def _ymd(d: dt.date) -> str:
     return d.strftime("%Y-%m-%d")
 
 
+def _num(x) -> float:
+    if isinstance(x, (int, float)):
+        return float(x)
+    try:
+        return float(x)
+    except Exception:
+        return 0.0
+
+
+def _iter_usage_items(data):
+    """
+    Liefert die Usage-Items möglichst generisch, ohne Zwischenliste:
+    `data`, sonst `daily_costs`, sonst alle Listen im Top-Level-Dict.
+    """
+    if not isinstance(data, dict):
+        return
+    if isinstance(data.get("data"), list):
+        yield from data["data"]
+    elif isinstance(data.get("daily_costs"), list):
+        yield from data["daily_costs"]
+    else:
+        for v in data.values():
+            if isinstance(v, list):
+                yield from v
+
+
+# Keep-Alive-Session für wiederholte Usage-Abfragen (spart TCP/TLS-Handshake)
+_SESSION = None
+
+
+def _session():
+    global _SESSION
+    if _SESSION is None:
+        # Lazy import: nur wenn Usage-API genutzt wird, brauchen wir requests
+        try:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+        except Exception as ie:
+            raise RuntimeError(
+                "Das Paket 'requests' ist nicht installiert (pip install requests)."
+            ) from ie
+        s = requests.Session()
+        s.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=2,
+                pool_maxsize=2,
+                max_retries=Retry(total=2, backoff_factor=0.3),
+            ),
+        )
+        _SESSION = s
+    return _SESSION
+
+
 def fetch_usage_month_to_date(project: str | None = PROJECT) -> dict:
     """
     Ruft Monatsverbrauch (seit 1. bis heute) von OpenAI ab.
     """
-    # Lazy import: nur wenn Funktion genutzt wird, brauchen wir requests
-    try:
-        import requests  # noqa: F401
-    except Exception as ie:
-        raise RuntimeError(
-            "Das Paket 'requests' ist nicht installiert (pip install requests)."
-        ) from ie
+    session = _session()
 
     # 👉 ENV zur Laufzeit lesen (statt nur Modulkonstanten)
     api_key = os.getenv("OPENAI_API_KEY") or API_KEY
@@ -216,7 +461,7 @@ def fetch_usage_month_to_date(project: str | None = PROJECT) -> dict:
     headers = {"Authorization": f"Bearer {api_key}"}
 
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=45)  # timeout in sec.
+        resp = session.get(url, headers=headers, params=params, timeout=45)  # timeout in sec.
     except Exception as e:
         raise RuntimeError(f"Usage-API nicht erreichbar: {type(e).__name__}: {e}") from e
 
@@ -241,35 +486,21 @@ def fetch_usage_month_to_date(project: str | None = PROJECT) -> dict:
         }
     )
 
-    # möglichst generisch Liste der Items finden
-    items: list = []
-    if isinstance(data, dict):
-        if isinstance(data.get("data"), list):
-            items = data["data"]
-        elif isinstance(data.get("daily_costs"), list):
-            items = data["daily_costs"]
-        else:
-            for v in data.values():
-                if isinstance(v, list):
-                    items.extend(v)
-
-    def _num(x, default=0.0):
-        try:
-            return float(x)
-        except Exception:
-            return float(default)
-
-    for it in items:
-        model = it.get("model") or it.get("name") or it.get("line_item") or "unknown"
-        inp = int(it.get("input_tokens", 0) or it.get("prompt_tokens", 0) or 0)
-        out = int(it.get("output_tokens", 0) or it.get("completion_tokens", 0) or 0)
-        tot = int(it.get("total_tokens", 0) or (inp + out))
-
-        cost = 0.0
-        if "cost" in it and isinstance(it["cost"], dict):
-            cost = _num(it["cost"].get("total_cost_usd", it["cost"].get("usd")))
+    for it in _iter_usage_items(data):
+        get = it.get
+        model = get("model") or get("name") or get("line_item") or "unknown"
+        inp = int(get("input_tokens") or get("prompt_tokens") or 0)
+        out = int(get("output_tokens") or get("completion_tokens") or 0)
+        tot = int(get("total_tokens") or (inp + out))
+
+        # Fallback-Ketten nur so weit auswerten wie nötig (kein eager .get(k, .get(...)))
+        c = get("cost")
+        if isinstance(c, dict):
+            cost = _num(c["total_cost_usd"] if "total_cost_usd" in c else c.get("usd"))
+        elif "total_cost_usd" in it:
+            cost = _num(it["total_cost_usd"])
         else:
-            cost = _num(it.get("total_cost_usd", it.get("cost_usd", it.get("cost"))))
+            cost = _num(it["cost_usd"] if "cost_usd" in it else c)
 
         total_in += inp
         total_out += out
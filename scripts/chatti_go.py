@@ -1,14 +1,19 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import errno
+import http.client
 import os
 import pathlib
+import shutil
 import socket
 import sys
-import urllib.request
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 # Projektwurzel in sys.path aufnehmen (so finden Imports vom Paket-Layout)
-ROOT = pathlib.Path(__file__).resolve().parents[1]
+# CHATTI_ROOT (z. B. im Console-Script-Shim gesetzt) spart das resolve() beim Start
+ROOT = pathlib.Path(os.environ.get("CHATTI_ROOT") or pathlib.Path(__file__).resolve().parents[1])
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
@@ -25,61 +30,83 @@ from core.api import (
     cli_user_add,
     cli_user_list,
     cli_user_remove,
+    cli_user_remove_by_name,
     cli_user_use,
     get_client,
 )
 from core.paths import (
     DOCS_DIR,
+    GLOBAL_PROMPTS_DIR,
     ensure_global_docs_dir,
     ensure_global_prompts_seed,
     prune_orphan_secret_entries,
     prune_orphan_user_dirs,
 )
+from core.tickets import collect_tickets
 
 # ---------------- Internet-Check ----------------
-def check_internet(timeout: float = 2.0, retries: int = 2) -> tuple[bool, str]:
+def _tcp_probe(host: str, port: int, timeout: float) -> None:
+    with socket.create_connection((host, port), timeout=timeout):
+        pass
+
+
+def check_internet(timeout: float = 1.0, retries: int = 1) -> tuple[bool, str]:
     """Is access to internet reachable?"""
-    hosts = [("1.1.1.1", 443), ("8.8.8.8", 53)]
+    # 8.8.8.8:53 zuerst – in Captive-Portal-/Firmennetzen meist zuverlässiger erreichbar
+    hosts = [("8.8.8.8", 53), ("1.1.1.1", 443)]
     last_err = "(no tcp)"
     for attempt in range(retries + 1):
-        for host, port in hosts:
-            try:
-                with socket.create_connection((host, port), timeout=timeout):
-                    return True, ""
-            except Exception as e:
-                last_err = f"{type(e).__name__}: {e}"
+        # Alle Hosts parallel proben – der schnellste erfolgreiche gewinnt
+        no_route = True
+        pool = ThreadPoolExecutor(max_workers=len(hosts))
+        try:
+            pending = {pool.submit(_tcp_probe, h, p, timeout) for h, p in hosts}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    e = fut.exception()
+                    if e is None:
+                        return True, ""
+                    last_err = f"{type(e).__name__}: {e}"
+                    if getattr(e, "errno", None) not in (errno.ENETUNREACH, errno.EHOSTUNREACH):
+                        no_route = False
+        finally:
+            # Nicht auf langsame Nachzügler warten
+            pool.shutdown(wait=False, cancel_futures=True)
+        # Keine Route zu irgendeinem Host → Wiederholen bringt nichts
+        if no_route:
+            break
         if attempt < retries:
-            import time
-
-            time.sleep(0.5)
+            time.sleep(0.25 * 2**attempt)
 
-    # HTTP-Fallback zuletzt
+    # HTTP-Fallback zuletzt (HEAD – kein Body, kein urllib-Opener-Stack)
+    conn = http.client.HTTPSConnection("clients3.google.com", timeout=timeout)
     try:
-        resp = urllib.request.urlopen("https://clients3.google.com/generate_204", timeout=timeout)
+        conn.request("HEAD", "/generate_204")
+        resp = conn.getresponse()
         if resp.status in (200, 204):
             return True, ""
         return False, f"unexpected http status: {resp.status}"
     except Exception as e:
         return False, f"{type(e).__name__}: {e} (last TCP error: {last_err})"
+    finally:
+        conn.close()
 
 
-def show_welcome() -> None:
-    cfg = load_config_effective(uid=sec.get_active_uid())
-    if not as_bool(cfg, "show_welcome", True):
-        return
-
-    # Kleine Hilfsfunktion: Farbname -> ANSI-String, None -> ""
-    def c(name: str) -> str:
-        return normalize_color(name) or ""
+# Farben einmal beim Laden auflösen: Farbname -> ANSI-String, None -> ""
+class _C:
+    BOLD = normalize_color("bold") or ""
+    RESET = normalize_color("reset") or ""
+    GREEN = normalize_color("green") or ""
+    BRIGHT_RED = normalize_color("bright_red") or ""
+    YELLOW = normalize_color("yellow") or ""
 
-    # Bunter Titel als separate Zeile (mit f-String!)
-    title_line = (
-        f"🟢 {c('bold')}{c('green')}Chatti!{c('reset')} "
-        f"– client-side privacy out of the box! 🟢{c('reset')}"
-    )
 
-    welcome_lines = [
-        title_line,
+# Bunter Titel + Begrüßungstext als fertiger String
+_WELCOME_TEXT = "\n".join(
+    [
+        f"🟢 {_C.BOLD}{_C.GREEN}Chatti!{_C.RESET} "
+        f"– client-side privacy out of the box! 🟢{_C.RESET}",
         "Chatti ist ein schlanker, sicherer, smarter TUI-Client für OpenAI-Modelle.",
         "",
         "→ Hilfe & Doku:",
@@ -94,164 +121,206 @@ def show_welcome() -> None:
         "    Weitere Infos & Preise unter https://platform.openai.com/account/api-keys",
         "",
     ]
+)
+
 
+def show_welcome(cfg: dict) -> None:
+    if not as_bool(cfg, "show_welcome", True):
+        return
+
+    parts = []
     if as_bool(cfg, "show_ascii_art", True):
         ascii_path = ROOT / "scripts/chatti-ascii-art.txt"
         if ascii_path.exists():
             with open(ascii_path, encoding="utf-8") as f:
-                print(f.read())
+                parts.append(f.read() + "\n")
 
-    print()
-    print("\n".join(welcome_lines))
+    # Banner (inkl. ASCII-Art) in einem write ausgeben
+    parts.append("\n" + _WELCOME_TEXT + "\n")
+    sys.stdout.write("".join(parts))
 
 
 # ---------------- Argumente ----------------
+# Schalter ohne Wert: argv-Token -> Schlüssel in args
+_SIMPLE_FLAGS = {
+    "-h": "help",
+    "--help": "help",
+    "--readme": "readme",
+    "-m": "manual",
+    "--manual": "manual",
+    "--doc": "doc",
+    "--doctor": "doctor",
+    "--verify": "verify",
+    # --- Benutzerverwaltung ---
+    "--user-add": "user_add",
+    "--user-list": "user_list",
+    "--hard": "user_remove_hard",
+    "--all": "user_remove_all",
+    # Support-Tickets:
+    "--collect-tickets": "collect_tickets",
+    # --- Admin-PIN-Tools ---
+    "--admin-set-pin": "admin_set_pin",
+    "--admin-change-pin": "admin_change_pin",
+    "--_factory-reset": "_factory_reset",
+}
+
+# Schalter mit Wert: "--flag=wert" oder "--flag wert"
+_VALUE_FLAGS = {
+    "--user-use": "user_use",
+    "--user-remove": "user_remove",
+    "--user-remove-name": "user_remove_name",
+}
+
+
+# Defaults einmalig als Konstante; _parse_args kopiert nur
+_DEFAULT_ARGS = {
+    "help": False,
+    "doc": False,
+    "doctor": False,
+    "verify": False,
+    "readme": False,
+    "manual": False,
+    "reset": None,  # "soft" | "hard" | None
+    "collect_tickets": False,  # collect support-ticket
+    "user_add": False,  # --user-add
+    "user_list": False,  # --user-list
+    "user_use": None,  # --user-use <name|uid> | --user-use=<...>
+    "user_remove": None,  # --user-remove <name|uid> | --user-remove=<...>
+    "user_remove_hard": False,  # --hard (nur mit --user-remove)
+    "user_remove_name": None,  # --user-remove-name "<Name>"
+    "user_remove_all": False,  # --all (nur sinnvoll in Kombi mit --user-remove-name)
+    "admin_set_pin": False,  # --admin-set-pin
+    "admin_change_pin": False,  # --admin-change-pin
+    "_factory_reset": False,  # --_factory-reset (not in public help or in public api)
+}
+
+
 def _parse_args(argv: list[str]) -> dict:
-    args = {
-        "help": False,
-        "doc": False,
-        "doctor": False,
-        "verify": False,
-        "readme": False,
-        "manual": False,
-        "reset": None,  # "soft" | "hard" | None
-        "collect_tickets": False,  # collect support-ticket
-        "user_add": False,  # --user-add
-        "user_list": False,  # --user-list
-        "user_use": None,  # --user-use <name|uid> | --user-use=<...>
-        "user_remove": None,  # --user-remove <name|uid> | --user-remove=<...>
-        "user_remove_hard": False,  # --hard (nur mit --user-remove)
-        "user_remove_name": None,  # --user-remove-name "<Name>"
-        "user_remove_all": False,  # --all (nur sinnvoll in Kombi mit --user-remove-name)
-        "admin_set_pin": False,  # --admin-set-pin
-        "admin_change_pin": False,  # --admin-change-pin
-        "_factory_reset": False,  # --_factory-reset (not in public help or in public api)
-    }
+    args = dict(_DEFAULT_ARGS)
+    if not argv:
+        return args
 
     i = 0
     while i < len(argv):
         a = argv[i]
-        if a in ("-h", "--help"):
-            args["help"] = True
-        elif a in ("--readme",):
-            args["readme"] = True
-        elif a in ("-m", "--manual"):
-            args["manual"] = True
-        elif a == "--doc":
-            args["doc"] = True
-        elif a == "--doctor":
-            args["doctor"] = True
-        elif a == "--verify":
-            args["verify"] = True
-        elif a.startswith("--reset-auth"):
-            mode = "soft"
-            if "=" in a:
-                _, _, v = a.partition("=")
+        # Einmal an "=" teilen – danach nur noch Dict-Lookups
+        head, eq, v = a.partition("=")
+        if eq:
+            # --flag=wert
+            if head == "--reset-auth":
                 v = v.strip().lower()
-                if v in ("soft", "hard"):
-                    mode = v
-            args["reset"] = mode
-
-        # --- Benutzerverwaltung ---
-        elif a == "--user-add":
-            args["user_add"] = True
-        elif a == "--user-list":
-            args["user_list"] = True
-        elif a.startswith("--user-use="):
-            _, _, v = a.partition("=")
-            args["user_use"] = v.strip()
-        elif a == "--user-use":
-            if i + 1 < len(argv) and not argv[i + 1].startswith("--"):
-                args["user_use"] = argv[i + 1].strip()
-                i += 1
-        elif a.startswith("--user-remove="):
-            _, _, v = a.partition("=")
-            args["user_remove"] = v.strip()
-        elif a == "--user-remove":
+                args["reset"] = v if v in ("soft", "hard") else "soft"
+            elif (key := _VALUE_FLAGS.get(head)) is not None:
+                v = v.strip()
+                if key == "user_remove_name":
+                    v = v.strip('"').strip("'")
+                args[key] = v
+        elif (key := _SIMPLE_FLAGS.get(a)) is not None:
+            args[key] = True
+        elif a == "--reset-auth":
+            args["reset"] = "soft"
+        elif (key := _VALUE_FLAGS.get(a)) is not None:
+            # --flag wert
             if i + 1 < len(argv) and not argv[i + 1].startswith("--"):
-                args["user_remove"] = argv[i + 1].strip()
+                args[key] = argv[i + 1].strip()
                 i += 1
-        elif a == "--hard":
-            args["user_remove_hard"] = True
-
-        elif a.startswith("--user-remove-name="):
-            _, _, v = a.partition("=")
-            args["user_remove_name"] = v.strip().strip('"').strip("'")
-        elif a == "--user-remove-name":
-            if i + 1 < len(argv) and not argv[i + 1].startswith("--"):
-                args["user_remove_name"] = argv[i + 1].strip()
-                i += 1
-        elif a == "--all":
-            args["user_remove_all"] = True
-
-        # Support-Tickets:
-        elif a == "--collect-tickets":
-            args["collect_tickets"] = True
-
-        # --- Admin-PIN-Tools ---
-        elif a == "--admin-set-pin":
-            args["admin_set_pin"] = True
-        elif a == "--admin-change-pin":
-            args["admin_change_pin"] = True
-        elif a == "--_factory-reset":
-            args["_factory_reset"] = True
         i += 1
 
     return args
 
 
 # --- Help/Manual ----------------
-def _print_help() -> None:
-    print("Chatti — CLI-Client\n")
-    print("Verwendung:")
-    print("  chatti <[--Optionen]>")
-    print()
-    print("Optionen:")
-    print(
-        "  --admin-set-pin            Einmalig Admin-PIN setzen (Pflicht vor sensiblen Aktionen)."
-    )
-    print("  --admin-change-pin         Admin-PIN ändern (erfordert aktuelle PIN-Eingabe).")
-    print()
-    print(
-        "  --verify                   Führe beim Start einen kurzen Smoke-Test (API-Key/Modell) aus."
-    )
-    print("  --reset-auth[=soft|hard]   Zurücksetzen gespeicherter Authentifizierungsdaten.")
-    print(
-        "                              soft = löscht Schlüssel; Neu-Einrichtung beim nächsten Start"
-    )
-    print("                              hard = zusätzlich lokale Caches löschen")
-    print("  --doc, --doctor            Diagnose laufen lassen.")
-    print("  --collect-tickets          Listet alle ticket.txt aus allen User-Verzeichnissen.")
-    print("  -h, --help                 Diese Hilfe anzeigen")
-    print("  --readme             Basics (README.md) anzeigen.")
-    print("  -m, --manual             Ausführliche Anleitung (Manpage/Manual) anzeigen.")
-    print("  --user-add                 Neuen Benutzer anlegen (Name, API-Key, Master).")
-    print("  --user-list                Benutzerliste anzeigen (entschlüsselt; fragt Master).")
-    print("  --user-use <Name|UID>      Aktiven Benutzer setzen (fragt Master).")
-    print("  --user-remove-name '<Name|UID>' und --all (für Massenlöschung desselben Namens).")
-    print(
-        "       --hard                Zusätzlich alle Benutzerdaten löschen (History, Attachments …)."
+_HELP_TEXT = "\n".join(
+    (
+        "Chatti — CLI-Client",
+        "",
+        "Verwendung:",
+        "  chatti <[--Optionen]>",
+        "",
+        "Optionen:",
+        "  --admin-set-pin            Einmalig Admin-PIN setzen (Pflicht vor sensiblen Aktionen).",
+        "  --admin-change-pin         Admin-PIN ändern (erfordert aktuelle PIN-Eingabe).",
+        "",
+        "  --verify                   Führe beim Start einen kurzen Smoke-Test (API-Key/Modell) aus.",
+        "  --reset-auth[=soft|hard]   Zurücksetzen gespeicherter Authentifizierungsdaten.",
+        "                              soft = löscht Schlüssel; Neu-Einrichtung beim nächsten Start",
+        "                              hard = zusätzlich lokale Caches löschen",
+        "  --doc, --doctor            Diagnose laufen lassen.",
+        "  --collect-tickets          Listet alle ticket.txt aus allen User-Verzeichnissen.",
+        "  -h, --help                 Diese Hilfe anzeigen",
+        "  --readme             Basics (README.md) anzeigen.",
+        "  -m, --manual             Ausführliche Anleitung (Manpage/Manual) anzeigen.",
+        "  --user-add                 Neuen Benutzer anlegen (Name, API-Key, Master).",
+        "  --user-list                Benutzerliste anzeigen (entschlüsselt; fragt Master).",
+        "  --user-use <Name|UID>      Aktiven Benutzer setzen (fragt Master).",
+        "  --user-remove-name '<Name|UID>' und --all (für Massenlöschung desselben Namens).",
+        "       --hard                Zusätzlich alle Benutzerdaten löschen (History, Attachments …).",
+        "",
     )
-    print()
+)
 
-def _print_readme() -> int:
-    """Zeigt die README—Priorität: globale DOCS_DIR, dann Repo-Files."""
-    candidates = [
-        DOCS_DIR / "README.md",
-        DOCS_DIR / "README.txt",
-        ROOT / "README.md",
-        ROOT / "README.txt",
-    ]
 
-    for path in candidates:
+def _print_help() -> None:
+    # Ein einziger write statt ~20 print()-Aufrufe
+    sys.stdout.write(_HELP_TEXT + "\n")
+
+
+# (st_mtime_ns, {Dateiname: Pfad}) für DOCS_DIR – ein readdir statt einzelner stat()s
+_DOCS_INDEX: tuple[int, dict[str, str]] | None = None
+
+
+def _docs_index() -> dict[str, str]:
+    """Dateien in DOCS_DIR per os.scandir; neu aufgebaut nur, wenn sich die mtime ändert."""
+    global _DOCS_INDEX
+    try:
+        mtime = os.stat(DOCS_DIR).st_mtime_ns
+    except OSError:
+        return {}
+    if _DOCS_INDEX is None or _DOCS_INDEX[0] != mtime:
+        with os.scandir(DOCS_DIR) as it:
+            _DOCS_INDEX = (mtime, {e.name: e.path for e in it if e.is_file()})
+    return _DOCS_INDEX[1]
+
+
+def _print_first(doc_names: tuple[str, ...], fallbacks: tuple[str, ...]) -> bool:
+    """Streamt den ersten lesbaren Kandidaten nach STDOUT (EAFP, kein exists()-Vorabcheck)."""
+    index = _docs_index()
+    candidates = [index[n] for n in doc_names if n in index]
+    candidates.extend(fallbacks)
+    for p in candidates:
         try:
-            if path.exists():
-                text = path.read_text(encoding="utf-8")
-                print(text)
-                return 0
-        except Exception:
+            f = open(p, "rb")
+        except OSError:
             # Nächsten Kandidaten versuchen
-            pass
+            continue
+        with f:
+            # Bytes 1:1 durchreichen – kein Decode/Encode, kein Komplett-Puffer
+            sys.stdout.flush()
+            shutil.copyfileobj(f, sys.stdout.buffer)
+            sys.stdout.buffer.flush()
+        return True
+    return False
+
+
+# Kandidaten (Priorität: globale DOCS_DIR, dann Repo-Files); Repo-Pfade einmalig als str
+_README_NAMES = ("README.md", "README.txt")
+_README_FALLBACKS = (str(ROOT / "README.md"), str(ROOT / "README.txt"))
+_MANUAL_NAMES = ("MANUAL.md", "README.md", "MANUAL.txt", "README.txt")
+_MANUAL_FALLBACKS = tuple(
+    str(p)
+    for p in (
+        ROOT / "docs" / "MANUAL.md",
+        ROOT / "docs" / "MANUAL.txt",
+        ROOT / "README.md",
+        ROOT / "README.txt",
+    )
+)
+
+
+def _print_readme() -> int:
+    """Zeigt die README—Priorität: globale DOCS_DIR, dann Repo-Files."""
+    if _print_first(_README_NAMES, _README_FALLBACKS):
+        return 0
 
     print("Keine README im Root-Ordner (/chatti) gefunden.")
     try:
@@ -263,26 +332,8 @@ def _print_readme() -> int:
 
 def _print_manual() -> int:
     """Zeigt die Manpage/README—Priorität: globale DOCS_DIR, dann Repo-Files."""
-    candidates = [
-        DOCS_DIR / "MANUAL.md",
-        DOCS_DIR / "README.md",
-        DOCS_DIR / "MANUAL.txt",
-        DOCS_DIR / "README.txt",
-        ROOT / "docs" / "MANUAL.md",
-        ROOT / "docs" / "MANUAL.txt",
-        ROOT / "README.md",
-        ROOT / "README.txt",
-    ]
-
-    for path in candidates:
-        try:
-            if path.exists():
-                text = path.read_text(encoding="utf-8")
-                print(text)
-                return 0
-        except Exception:
-            # Nächsten Kandidaten versuchen
-            pass
+    if _print_first(_MANUAL_NAMES, _MANUAL_FALLBACKS):
+        return 0
 
     print("Keine Manpage/Anleitung gefunden. Lege MANUAL.md unter DOCS_DIR an oder siehe README.")
     try:
@@ -292,22 +343,27 @@ def _print_manual() -> int:
     return 1
 
 
-def _confirm(prompt: str, default: bool = False) -> bool:
-    suf = " [Y/n] " if default else " [y/N] "
+def _confirm(prompt: str, default: bool = False, *, abort_msg: str = "") -> bool:
+    """y/N-Abfrage ohne input() – spart die readline-Initialisierung."""
+    sys.stdout.write(prompt + (" [Y/n] " if default else " [y/N] "))
+    sys.stdout.flush()
     try:
-        ans = input(prompt + suf).strip().lower()
-    except (KeyboardInterrupt, EOFError):
-        print()
+        line = sys.stdin.readline()
+    except KeyboardInterrupt:
+        line = ""
+    if not line:
+        # EOF / Strg+C → wie Abbruch behandeln
+        print("\n" + abort_msg if abort_msg else "")
         return False
+    ans = line.strip().lower()
     if not ans:
         return default
     return ans in ("y", "yes", "j", "ja")
 
 
 # --- Kurzer Hinweis bei fälligem API-Selfcheck (reine Terminal-Ausgabe) ---
-def _maybe_print_selfcheck_notice() -> None:
+def _maybe_print_selfcheck_notice(cfg: dict) -> None:
     try:
-        cfg = load_config_effective(uid=sec.get_active_uid())
         model = _preferred_model_from_conf_env()
         if _should_run_selfcheck(cfg, model):
             print("⏳ Kurzer API-Gesundheitscheck läuft …", flush=True)
@@ -316,64 +372,157 @@ def _maybe_print_selfcheck_notice() -> None:
         pass
 
 
-# ---------------- Main ----------------
-def main() -> int:
-    argv = sys.argv[1:]
-    args = _parse_args(argv)
+# ---------------- TUI ----------------
+def _run_tui(cfg: dict, *, require_smoke: bool = False) -> int:
+    # Netzcheck nur hier – CLI-Kommandos (User-Verwaltung, Tickets …) laufen auch offline
+    if os.getenv("CHATTI_SKIP_NETCHECK") != "1":
+        ok, err = check_internet()
+        if not ok:
+            print(
+                f"🚫 {_C.BOLD}{_C.BRIGHT_RED}Kein Internet:{_C.RESET}",
+                err,
+            )
+            print(
+                f"⚠️{_C.BOLD}{_C.YELLOW} ---> Hinweis: Prüfe WLAN/LAN, VPN/Proxy oder Captive Portal (Login-Seite).{_C.RESET}"
+            )
+            return 2
+
+    show_welcome(cfg)
+
+    # TUI-Stack erst hier importieren – --help, --manual, --doctor usw. zahlen das nicht
+    from chatti.chatti_tui import ChattiTUI
+
+    _maybe_print_selfcheck_notice(cfg)
+    get_client(require_smoke=require_smoke)
 
-    # leises Aufräumen (keine Ausgabe, Fehler ignorieren)
     try:
-        prune_orphan_user_dirs(verbose=False)
-        prune_orphan_secret_entries(verbose=False)
-    except Exception:
-        pass
+        ChattiTUI().run()
+        return 0
+    except KeyboardInterrupt:
+        print("\n[Abgebrochen]")
+        return 130
+    except Exception as e:
+        print(f"Unerwarteter Fehler: {e}")
+        return 2
+
+
+# ---------------- Subkommandos ----------------
+def _do_help(_args: dict) -> int:
+    _print_help()
+    return 0
+
+
+def _do_readme(_args: dict) -> int:
+    return _print_readme()
+
+
+def _do_manual(_args: dict) -> int:
+    return _print_manual()
+
+
+def _do_doctor(_args: dict) -> int:
+    from tools.chatti_doctor import main as doctor_main
+
+    return doctor_main()
+
 
+def _do_collect_tickets(_args: dict) -> int:
     # Collect tickets throughout all user-dirs
-    if args.get("collect_tickets"):
-        try:
-            from core.api import collect_tickets
-
-            rows = collect_tickets()
-            if not rows:
-                print("Keine Tickets gefunden.")
-                return 0
-            print("Tickets:")
-            for uid, path, first in rows:
-                preview = (first or "").strip()
-                print(f"  {uid}: {path}")
-                if preview:
-                    print(f"     → {preview}")
-            return 0
-        except KeyboardInterrupt:
-            print("\n[Abgebrochen]")
-            return 130
-        except Exception as e:
-            print(f"[Setup-Fehler] {e}")
-            return 1
+    rows = collect_tickets()
+    if not rows:
+        print("Keine Tickets gefunden.")
+        return 0
+    print("Tickets:")
+    for uid, path, first in rows:
+        preview = (first or "").strip()
+        print(f"  {uid}: {path}")
+        if preview:
+            print(f"     → {preview}")
+    return 0
 
-    # --- First-run: decide Single vs Multi-user ---
-    try:
-        # Erstkonfiguration: keine User & kein Admin-PIN → einmalig fragen
-        if sec.count_users_in_secrets() == 0 and not sec.has_admin_pin():
 
-            def _ask_yn(prompt: str, default_no: bool = True) -> bool:
-                suf = " [y/N] " if default_no else " [Y/n] "
-                try:
-                    ans = input(prompt + suf).strip().lower()
-                except (KeyboardInterrupt, EOFError):
-                    print("\nAbgebrochen.")
-                    return False
-                if not ans:
-                    return not default_no
-                return ans in ("y", "yes", "j", "ja")
-
-            if _ask_yn("Möchtest du einen Multi-User-Modus einrichten (Admin-PIN setzen)?"):
+def _do_factory_reset(_args: dict) -> int:
+    # Hidden Easter Egg: complete reset, afterwards new init
+    from core.api import cli_factory_reset
+
+    return cli_factory_reset()
+
+
+def _do_user_list(_args: dict) -> int:
+    cli_user_list()
+    return 0
+
+
+def _do_user_use(args: dict) -> int:
+    val = args["user_use"]
+    if not val:
+        print("Fehler: --user-use benötigt einen Namen oder eine UID.")
+        return 2
+    cli_user_use(val)
+    return 0
+
+
+def _do_user_remove_name(args: dict) -> int:
+    # Admin-PIN nur verlangen, wenn wirklich User existieren
+    if sec.count_users_in_secrets() > 0:
+        sec.ensure_admin_pin_initialized_interactive(strict=True)
+        if not sec.verify_admin_pin_interactive():
+            print("Abgebrochen.")
+            return 2
+    cli_user_remove_by_name(
+        args["user_remove_name"],
+        hard=bool(args["user_remove_hard"]),
+        all_matches=bool(args["user_remove_all"]),
+    )
+    return 0
+
+
+# Rein lesende Aktionen (ohne PIN-Zwang) → laufen vor dem Aufräumen
+_INFO_HANDLERS = {
+    "help": _do_help,
+    "readme": _do_readme,
+    "manual": _do_manual,
+    "doc": _do_doctor,
+    "doctor": _do_doctor,
+}
+
+# Nach dem First-run-Check, Reihenfolge = Priorität
+_USER_HANDLERS = {
+    "_factory_reset": _do_factory_reset,
+    # --- Nicht-admin: user-list / user-use früh behandeln ---
+    "user_list": _do_user_list,
+    "user_use": _do_user_use,
+}
+
+
+def _dispatch(handlers: dict, args: dict) -> int | None:
+    """Erster gesetzte Schalter gewinnt; None, falls keiner greift."""
+    for key, handler in handlers.items():
+        if args[key] not in (False, None):
+            return handler(args)
+    return None
+
+
+# ---------------- Main ----------------
+# Sentinel für erfolgreiches Seeding; liegt im geseedeten Prompt-Ordner, damit ein
+# gelöschtes Config-Verzeichnis neu seedet. Version hochzählen, um nach Updates neu zu seeden
+_SEED_SENTINEL = GLOBAL_PROMPTS_DIR / ".seeded_v1"
+
+
+def _first_run_setup() -> int | None:
+    """Erstkonfiguration: keine User & kein Admin-PIN → einmalig fragen."""
+    try:
+        # Reihenfolge: billige stat()-Checks zuerst, Secrets nur parsen wenn nötig
+        if not sec.has_admin_pin() and (
+            sec.secrets_file_is_empty() or sec.count_users_in_secrets() == 0
+        ):
+            if _confirm(
+                "Möchtest du einen Multi-User-Modus einrichten (Admin-PIN setzen)?",
+                abort_msg="Abgebrochen.",
+            ):
                 try:
                     sec.ensure_admin_pin_initialized_interactive(strict=True)
                     print("✓ Admin-PIN eingerichtet.")
-                except KeyboardInterrupt:
-                    print("\nAbgebrochen.")
-                    return 130
                 except RuntimeError as e:
                     print(str(e))
                     return 1
@@ -385,47 +534,37 @@ def main() -> int:
     except Exception:
         # im Zweifel nicht blockieren
         pass
+    return None
 
-    # Hidden Easter Egg: complete reset, afterwards new init
-    if args.get("_factory_reset"):
-        try:
-            from core.api import cli_factory_reset
 
-            return cli_factory_reset()
-        except KeyboardInterrupt:
-            print("\n[Abgebrochen]")
-            return 130
-        except Exception as e:
-            print(f"[Setup-Fehler] {e}")
-            return 1
+def _main(args: dict) -> int:
+    # --- Help/Manual/Doctor: ohne PIN-Zwang, rein lesend → vor dem Aufräumen ---
+    if (rc := _dispatch(_INFO_HANDLERS, args)) is not None:
+        return rc
 
-    # --- Nicht-admin: user-list / user-use früh behandeln ---
-    if args.get("user_list") or args.get("user_use") is not None:
-        try:
-            if args.get("user_list"):
-                cli_user_list()
-                return 0
-            if args.get("user_use") is not None:
-                val = args["user_use"]
-                if not val:
-                    print("Fehler: --user-use benötigt einen Namen oder eine UID.")
-                    return 2
-                cli_user_use(val)
-                return 0
-        except KeyboardInterrupt:
-            print("\n[Abgebrochen]")
-            return 130
-        except Exception as e:
-            print(f"[Setup-Fehler] {e}")
-            return 1
+    # leises Aufräumen (keine Ausgabe, Fehler ignorieren)
+    try:
+        prune_orphan_user_dirs(verbose=False)
+        prune_orphan_secret_entries(verbose=False)
+    except Exception:
+        pass
+
+    if args["collect_tickets"]:
+        return _do_collect_tickets(args)
+
+    # --- First-run: decide Single vs Multi-user ---
+    if (rc := _first_run_setup()) is not None:
+        return rc
+
+    if (rc := _dispatch(_USER_HANDLERS, args)) is not None:
+        return rc
 
     # --- Admin-CLI: user-add / user-remove (PIN-Pflicht je nach Zustand) ---
-    # if args.get("user_remove") is not None:
-    if args.get("user_add") or args.get("user_remove") is not None:
+    if args["user_add"] or args["user_remove"] is not None:
         # Für --user-add: Admin-PIN erst ab dem ZWEITEN User erzwingen
-        need_admin_for_add = args.get("user_add") and sec.has_any_user()
+        need_admin_for_add = args["user_add"] and sec.has_any_user()
         # Für --user-remove: sobald jemand existiert, absichern
-        need_admin_for_remove = args.get("user_remove") is not None and sec.has_any_user()
+        need_admin_for_remove = args["user_remove"] is not None and sec.has_any_user()
 
         if need_admin_for_add or need_admin_for_remove:
             try:
@@ -437,69 +576,23 @@ def main() -> int:
                 print(str(e))
                 return 1
 
-        try:
-            if args.get("user_add"):
-                try:
-                    cli_user_add(_preferred_model_from_conf_env())
-                except KeyboardInterrupt:
-                    print("\nAbgebrochen.")
-                    return 130
-                except Exception as e:
-                    print(f"[Setup-Fehler] {e}")
-                    return 1
-
-            if args.get("user_remove") is not None:
-                who = args["user_remove"]
-                if not who:
-                    print("Fehler: --user-remove benötigt einen Namen oder eine UID.")
-                    return 2
-                cli_user_remove(who, hard=bool(args.get("user_remove_hard")))
-                return 0
-        except KeyboardInterrupt:
-            print("\n[Abgebrochen]")
-            return 130
-        except Exception as e:
-            print(f"[Setup-Fehler] {e}")
-            return 1
+        if args["user_add"]:
+            # kein return: nach dem Anlegen geht es normal in die TUI
+            cli_user_add(_preferred_model_from_conf_env())
 
-    # --- Admin-CLI: user-remove-name (PIN-Pflicht) ---
-    if args.get("user_remove_name") is not None:
-        # Admin-PIN nur verlangen, wenn wirklich User existieren
-        if sec.count_users_in_secrets() > 0:
-            sec.ensure_admin_pin_initialized_interactive(strict=True)
-            if not sec.verify_admin_pin_interactive():
-                print("Abgebrochen.")
+        if args["user_remove"] is not None:
+            who = args["user_remove"]
+            if not who:
+                print("Fehler: --user-remove benötigt einen Namen oder eine UID.")
                 return 2
-        name = args["user_remove_name"]
-        hard = bool(args.get("user_remove_hard"))
-        all_matches = bool(args.get("user_remove_all"))
-        try:
-            from core.api import cli_user_remove_by_name
-
-            cli_user_remove_by_name(name, hard=hard, all_matches=all_matches)
+            cli_user_remove(who, hard=bool(args["user_remove_hard"]))
             return 0
-        except KeyboardInterrupt:
-            print("\n[Abgebrochen]")
-            return 130
-        except Exception as e:
-            print(f"[Setup-Fehler] {e}")
-            return 1
 
-    # --- Help/Manual/Doctor/Reset: ohne PIN-Zwang ---
-    if args["help"]:
-        _print_help()
-        return 0
-
-    if args["readme"]:
-        return _print_readme()
-
-    if args["manual"]:
-        return _print_manual()
-
-    if args.get("doc") or args.get("doctor"):
-        from tools.chatti_doctor import main as doctor_main
-        return doctor_main()
+    # --- Admin-CLI: user-remove-name (PIN-Pflicht) ---
+    if args["user_remove_name"] is not None:
+        return _do_user_remove_name(args)
 
+    # --- Verify/Reset: ohne PIN-Zwang ---
     if args["verify"]:
         try:
             get_client(require_smoke=True, non_interactive=False)
@@ -524,42 +617,28 @@ def main() -> int:
             print(f"Fehler beim Zurücksetzen: {e}")
             return 1
 
-    # Prompts + Docs seeden (best effort)
-    try:
-        ensure_global_prompts_seed()
-        ensure_global_docs_dir()  # NEU
-    except Exception as e:
-        print(f"⚠️ Setup-Hinweis: {type(e).__name__}: {e}")
+    # Prompts + Docs seeden (best effort) – nur einmal pro Seed-Version
+    seeded = _SEED_SENTINEL.exists() and DOCS_DIR.is_dir()
+    if os.getenv("CHATTI_FORCE_SEED") == "1" or not seeded:
+        try:
+            # Sentinel nur setzen, wenn beide Schritte wirklich geklappt haben
+            prompts_ok = ensure_global_prompts_seed()
+            docs_ok = ensure_global_docs_dir()  # NEU
+            if prompts_ok and docs_ok:
+                _SEED_SENTINEL.touch()
+        except Exception as e:
+            print(f"⚠️ Setup-Hinweis: {type(e).__name__}: {e}")
 
     # --- Ab hier normaler Start: TUI ---
-    if os.getenv("CHATTI_SKIP_NETCHECK") != "1":
-        ok, err = check_internet()
-        if not ok:
-            print(
-                f"🚫 {normalize_color('bold')}{normalize_color('bright_red')}Kein Internet:{normalize_color('reset')}",
-                err,
-            )
-            print(
-                f"⚠️{normalize_color('bold')}{normalize_color('yellow')} ---> Hinweis: Prüfe WLAN/LAN, VPN/Proxy oder Captive Portal (Login-Seite).{normalize_color('reset')}"
-            )
-            return 2
-
-    show_welcome()
-
-    try:
-        from chatti.chatti_tui import ChattiTUI
-    except KeyboardInterrupt:
-        print("\nAbgebrochen.")
-        return 130
-    except Exception as e:
-        print(f"[Setup-Fehler] {e}")
-        return 1
+    # Config einmal laden und an Welcome/Selfcheck durchreichen
+    cfg = load_config_effective(uid=sec.get_active_uid())
+    return _run_tui(cfg, require_smoke=bool(args["verify"]))
 
-    require_smoke = bool(args["verify"])
-    _maybe_print_selfcheck_notice()
 
+def main() -> int:
+    # Ein zentraler Handler statt try/except je Subkommando
     try:
-        get_client(require_smoke=require_smoke)
+        return _main(_parse_args(sys.argv[1:]))
     except KeyboardInterrupt:
         print("\n[Abgebrochen]")
         return 130
@@ -567,16 +646,6 @@ def main() -> int:
         print(f"[Setup-Fehler] {e}")
         return 1
 
-    try:
-        ChattiTUI().run()
-        return 0
-    except KeyboardInterrupt:
-        print("\n[Abgebrochen]")
-        return 130
-    except Exception as e:
-        print(f"Unerwarteter Fehler: {e}")
-        return 2
-
 
 if __name__ == "__main__":
     raise SystemExit(main())
@@ -3,6 +3,7 @@
 
 from __future__ import annotations
 
+import functools
 import os
 import shutil
 import subprocess
@@ -12,6 +13,7 @@ from pathlib import Path
 import chatti  # Paket selbst, um den Install-Pfad zu finden
 
 
+@functools.lru_cache(maxsize=1)
 def _docs_root() -> Path:
     """Ermittelt den Docs-Ordner relativ zum installierten chatti-Paket."""
     # chatti/__init__.py → .../site-packages/chatti/__init__.py
@@ -26,22 +28,29 @@ def _first_existing(paths: list[Path]) -> Path | None:
     return None
 
 
+@functools.lru_cache(maxsize=1)
+def _pager_cmd() -> tuple[str, ...] | None:
+    """Pager-Kommando (less -R / more) einmalig per PATH-Suche ermitteln."""
+    pager = shutil.which("less") or shutil.which("more")
+    if not pager:
+        return None
+    # Für less -R, damit Farben/Escape-Sequenzen durchgehen
+    return (pager, "-R") if os.path.basename(pager) == "less" else (pager,)
+
+
 def _page_file(path: Path) -> int:
     """Datei mit less/more anzeigen, falls vorhanden, sonst direkt auf STDOUT."""
-    pager = shutil.which("less") or shutil.which("more")
-    text = path.read_text(encoding="utf-8", errors="replace")
-
-    if pager:
-        # Für less optional -R, damit Farben/Escape-Sequenzen durchgehen
-        cmd = [pager]
-        if os.path.basename(pager) == "less":
-            cmd.append("-R")
-        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
-        proc.communicate(text.encode("utf-8", "replace"))
-        return proc.returncode or 0
-
-    # Fallback: stumpf auf STDOUT
-    sys.stdout.write(text)
+    cmd = _pager_cmd()
+
+    with open(path, "rb") as f:
+        if cmd:
+            # Datei direkt als stdin des Pagers – kein Umweg über Python-Speicher
+            return subprocess.run(cmd, stdin=f, check=False).returncode or 0
+
+        # Fallback: stumpf auf STDOUT
+        sys.stdout.flush()
+        shutil.copyfileobj(f, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
     return 0
 
 
@@ -61,7 +70,6 @@ def main(argv: list[str] | None = None) -> int:
     ]
 
     manpage = _first_existing(man_candidates)
-    mdfile = _first_existing(md_candidates)
 
     # 1) Bevorzugt: man(1), wenn manpage + man vorhanden
     if manpage and shutil.which("man"):
@@ -75,6 +83,8 @@ def main(argv: list[str] | None = None) -> int:
         return _page_file(manpage)
 
     # 3) Zweiter Fallback: Markdown (Manual / README / Install-Guide)
+    # – erst hier suchen, im Normalfall (Manpage da) spart das die stat()-Aufrufe
+    mdfile = _first_existing(md_candidates)
     if mdfile:
         return _page_file(mdfile)
 
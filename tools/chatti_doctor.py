@@ -20,11 +20,16 @@
 # set CHATTI_MASTER=mypassword && chatti --doc
 
 
+import importlib.util
+import json
 import os
+import re
 import sys
+import threading
 import time
-import traceback
 from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
 
 # Import only the public API functions from the core modules.
 from core.api import (
@@ -63,89 +68,286 @@ def _env_set_hint(var: str, value_placeholder: str = "dein-passwort") -> list[st
         return [f'{var}="{value_placeholder}" ./chatti --doc']
 
 
+# Fehlertext (lowercase) → freundliche Diagnose; Reihenfolge = Priorität
+_ERROR_TABLE = [
+    # häufige OpenAI-/HTTP-Themen
+    (re.compile(r"quota"), "Kein Guthaben / Kontingent erschöpft (bitte Billing prüfen)."),
+    (
+        re.compile(r"^(?=.*payment)(?=.*(?:method|add))", re.S),
+        "Zahlungsmethode fehlt – bitte im OpenAI-Konto hinterlegen.",
+    ),
+    (re.compile(r"rate limit|429"), "Rate-Limit erreicht – kurz warten und nochmal probieren."),
+    (re.compile(r"401|unauthorized|invalid api key"), "API-Key ungültig oder nicht berechtigt."),
+    (
+        re.compile(r"403|permission|access terminated"),
+        "Kein Zugriff auf dieses Modell (Berechtigungen fehlen).",
+    ),
+    (re.compile(r"404|not found"), "Modell nicht gefunden (id existiert nicht mehr)."),
+    (re.compile(r"timeout"), "Zeitüberschreitung – Netzwerk langsam oder Service hakt."),
+    (re.compile(r"ssl|tls"), "TLS/SSL-Problem – ggf. Netzwerk/Proxy prüfen."),
+    (re.compile(r"dns"), "DNS-Problem – Internetverbindung / Resolver prüfen."),
+]
+
+
 def _explain_exc_for_user(e: Exception) -> str:
     """Roh-Fehler → freundliche Diagnose (de) ohne Stacktrace."""
     s = str(e).strip()
     sl = s.lower()
 
-    # häufige OpenAI-/HTTP-Themen
-    if "insufficient_quota" in sl or "quota" in sl:
-        return "Kein Guthaben / Kontingent erschöpft (bitte Billing prüfen)."
-    if "payment" in sl and ("method" in sl or "add" in sl):
-        return "Zahlungsmethode fehlt – bitte im OpenAI-Konto hinterlegen."
-    if "rate limit" in sl or "429" in sl:
-        return "Rate-Limit erreicht – kurz warten und nochmal probieren."
-    if "401" in sl or "unauthorized" in sl or "invalid api key" in sl:
-        return "API-Key ungültig oder nicht berechtigt."
-    if "403" in sl or "permission" in sl or "access terminated" in sl:
-        return "Kein Zugriff auf dieses Modell (Berechtigungen fehlen)."
-    if "404" in sl or "not found" in sl:
-        return "Modell nicht gefunden (id existiert nicht mehr)."
-    if "timeout" in sl:
-        return "Zeitüberschreitung – Netzwerk langsam oder Service hakt."
-    if "ssl" in sl or "tls" in sl:
-        return "TLS/SSL-Problem – ggf. Netzwerk/Proxy prüfen."
-    if "dns" in sl:
-        return "DNS-Problem – Internetverbindung / Resolver prüfen."
+    for pat, msg in _ERROR_TABLE:
+        if pat.search(sl):
+            return msg
 
     # Fallback – letzte, neutrale Variante
     return f"Fehler beim Test: {s or type(e).__name__}"
 
 
+class _RateLimiter:
+    """
+    Einfacher, thread-sicherer Token-Bucket nach RPM/TPM.
+    acquire() schläft nur so lange, wie das Budget es verlangt – kein fixes sleep.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self._req_interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._tok_interval = 60.0 / tpm if tpm > 0 else 0.0
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, est_tokens: int = 0) -> None:
+        cost = max(self._req_interval, est_tokens * self._tok_interval)
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_allowed)
+            self._next_allowed = start + cost
+        if start > now:
+            time.sleep(start - now)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _batch_wait_sec() -> int:
+    # Obergrenze fürs Warten auf den Batch (CHATTI_DOCTOR_BATCH_WAIT, Sekunden)
+    return _env_int("CHATTI_DOCTOR_BATCH_WAIT", 120)
+
+
+def _delete_files_quietly(client, file_ids: Iterable[str | None]) -> None:
+    # Upload und Ergebnisdateien wieder entfernen – der Doctor hinterlässt nichts im Account
+    for file_id in file_ids:
+        if not file_id:
+            continue
+        try:
+            client.files.delete(file_id)
+        except Exception:
+            pass
+
+
+def _probe_models_batch(client, ids: list[str]) -> list[tuple[str, str, str]] | None:
+    """
+    Mini-Probes über die OpenAI-Batch-API (nicht echtzeitfähig, dafür ohne RPM-Druck).
+    Gibt None zurück, wenn die Batch-API ablehnt oder nicht rechtzeitig fertig wird –
+    dann übernimmt der Echtzeit-Pfad. Eingabe- und Ergebnisdateien werden danach gelöscht.
+    """
+    lines = "\n".join(
+        json.dumps(
+            {
+                "custom_id": mid,
+                "method": "POST",
+                "url": "/v1/responses",
+                "body": {"model": mid, "input": "ping", "max_output_tokens": 16},
+            }
+        )
+        for mid in ids
+    )
+    file_ids: list[str | None] = []
+    batch = None
+    try:
+        try:
+            f = client.files.create(
+                file=("chatti-doctor-probe.jsonl", lines.encode("utf-8")), purpose="batch"
+            )
+            file_ids.append(f.id)
+            batch = client.batches.create(
+                input_file_id=f.id, endpoint="/v1/responses", completion_window="24h"
+            )
+        except Exception as e:
+            hint = _explain_exc_for_user(e)
+            print(f"ℹ️  Batch-API nicht verfügbar ({hint}) – nutze Echtzeit-Probe.")
+            return None
+
+        # Pollen mit exponentiellem Backoff, begrenzt durch _batch_wait_sec()
+        deadline = time.monotonic() + _batch_wait_sec()
+        delay = 2.0
+        try:
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print("ℹ️  Batch noch nicht fertig – nutze Echtzeit-Probe.")
+                    return None
+                # letzter Schlaf endet genau an der Deadline, danach noch ein retrieve
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, 60.0)
+                batch = client.batches.retrieve(batch.id)
+
+            if batch.status != "completed":
+                print(f"ℹ️  Batch {batch.status} – nutze Echtzeit-Probe.")
+                return None
+
+            results: dict[str, tuple[str, str, str]] = {}
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if not file_id:
+                    continue
+                for raw in client.files.content(file_id).text.splitlines():
+                    if not raw.strip():
+                        continue
+                    rec = json.loads(raw)
+                    mid = rec.get("custom_id") or ""
+                    resp = rec.get("response") or {}
+                    code = resp.get("status_code")
+                    if code == 200:
+                        results[mid] = (mid, "OK", "")
+                        continue
+                    err = (resp.get("body") or {}).get("error") or rec.get("error") or {}
+                    msg = f"{code or ''} {err.get('code') or ''} {err.get('message') or ''}"
+                    results[mid] = (
+                        mid,
+                        "Kein Zugriff",
+                        _explain_exc_for_user(Exception(msg.strip())),
+                    )
+        except Exception as e:
+            hint = _explain_exc_for_user(e)
+            print(f"ℹ️  Batch-Auswertung fehlgeschlagen ({hint}) – nutze Echtzeit-Probe.")
+            return None
+    finally:
+        if batch is not None:
+            # Noch laufender Batch (Timeout/Fehler) wird abgebrochen, sonst entstehen Kosten
+            if batch.status not in ("completed", "failed", "expired", "cancelled"):
+                try:
+                    batch = client.batches.cancel(batch.id)
+                except Exception:
+                    pass
+            file_ids += [
+                getattr(batch, "output_file_id", None),
+                getattr(batch, "error_file_id", None),
+            ]
+        _delete_files_quietly(client, file_ids)
+
+    return [results.get(mid, (mid, "Nicht erreichbar", "Kein Batch-Ergebnis.")) for mid in ids]
+
+
 # --- replace your diagnose_models(...) with this version ---
-def diagnose_models(client, *, probe: bool = False, timeout: float = 2.0, max_models: int = 20):
+def diagnose_models(
+    client,
+    *,
+    probe: bool = False,
+    deep: bool = False,
+    batch: bool = False,
+    timeout: float = 2.0,
+    max_models: int = 20,
+):
     """
     Return [(model_id, status, hint)] for likely text-chat models only.
     status: "OK", "Kein Zugriff", "Nicht erreichbar"
+    Gelistete IDs gelten als erreichbar; models.retrieve nur mit deep=True.
     """
-    # from core.api import list_models_raw
-
     rows = []
     try:
-        all_ids: Iterable[str] = sorted(set(list_models_raw(client)))
+        # dict.fromkeys: entdoppeln unter Erhalt der API-Reihenfolge (sortiert wird in main())
+        all_ids: Iterable[str] = dict.fromkeys(list_models_raw(client))
     except Exception as e:
         return [("—", "Nicht erreichbar", _explain_exc_for_user(e))]
 
     # ids = [m for m in all_ids if _is_likely_text_chat_model(m)]
-    ids = [m for m in all_ids if is_chat_model(m)]
+    # Filtern + die ersten max_models nehmen in einem Durchlauf (0 = kein Limit)
+    chat_ids = (m for m in all_ids if is_chat_model(m))
+    ids = list(islice(chat_ids, max_models) if max_models > 0 else chat_ids)
     if not ids:
         return []
 
-    if max_models > 0:
-        ids = ids[:max_models]
+    # Ohne Probe/Deep: Listing reicht – keine weiteren Requests
+    if not probe and not deep:
+        return [(mid, "OK", "") for mid in ids]
+
+    # --probe-batch: Probes über die Batch-API, bei Ablehnung weiter mit Echtzeit
+    if probe and batch and not deep:
+        batch_rows = _probe_models_batch(client, ids)
+        if batch_rows is not None:
+            return batch_rows
 
     # 👇 neu: Client-Variante mit Timeout verwenden
+    # with_options() übernimmt den httpx-Client des Originals → alle Probe-Threads
+    # teilen denselben Keep-Alive-Pool (TLS-Handshake nur einmal je Verbindung).
+    # Kein eigener httpx.Client(http2=True): h2 ist keine Abhängigkeit von Chatti.
     try:
         c = client.with_options(timeout=timeout)
     except Exception:
         c = client  # Fallback: wenn SDK alt ist
 
-    for mid in ids:
-        try:
-            c.models.retrieve(mid)
-        except Exception as e:
-            rows.append((mid, "Nicht erreichbar", _explain_exc_for_user(e)))
-            continue
+    # proaktives Throttling statt 429-Stürmen (CHATTI_DOCTOR_RPM / CHATTI_DOCTOR_TPM)
+    limiter = _RateLimiter(_env_int("CHATTI_DOCTOR_RPM", 500), _env_int("CHATTI_DOCTOR_TPM", 40000))
 
-        if not probe:
-            rows.append((mid, "OK", ""))
-        else:
+    def _probe(mid: str) -> tuple[str, str, str]:
+        if deep:
+            # optionale Metadaten-Prüfung (--deep)
             try:
-                c.responses.create(
-                    model=mid,
-                    input="ping",
-                    max_output_tokens=16,
-                    timeout=timeout,
-                )
-                rows.append((mid, "OK", ""))
+                limiter.acquire()
+                c.models.retrieve(mid)
             except Exception as e:
-                rows.append((mid, "Kein Zugriff", _explain_exc_for_user(e)))
+                return (mid, "Nicht erreichbar", _explain_exc_for_user(e))
+
+        if not probe:
+            return (mid, "OK", "")
+        try:
+            limiter.acquire(est_tokens=16)
+            c.responses.create(
+                model=mid,
+                input="ping",
+                max_output_tokens=16,
+                timeout=timeout,
+            )
+            return (mid, "OK", "")
+        except Exception as e:
+            return (mid, "Kein Zugriff", _explain_exc_for_user(e))
 
-        time.sleep(0.02)
+    # Kein Zusammenfassen mehrerer Probes in einen Request: jede Probe gilt einem
+    # anderen Modell, und die Responses-API nimmt pro Call genau ein Modell/Input.
+    # Mehrere Prompts pro Call (completions prompt=[...]) würden nur dasselbe Modell
+    # mehrfach testen. Die Round-Trips werden stattdessen über den Pool überlappt.
+    # reine Netzwerk-I/O → Threads genügen; Parallelität per CHATTI_DOCTOR_CONCURRENCY (8)
+    workers = max(1, _env_int("CHATTI_DOCTOR_CONCURRENCY", 8))
+    with ThreadPoolExecutor(max_workers=min(workers, len(ids))) as ex:
+        rows.extend(ex.map(_probe, ids))
 
     return rows
 
 
+# Sortierreihenfolge der Modelldiagnose
+_STATUS_RANK = {"OK": 0, "Kein Zugriff": 1, "Nicht erreichbar": 2}
+
+
+def _prefetch_client() -> Future:
+    """
+    get_client() in einem Daemon-Thread starten. Bei einem frühen return aus main()
+    wartet der Interpreter beim Beenden nicht auf den Thread (anders als beim Executor).
+    """
+    fut: Future = Future()
+    fut.set_running_or_notify_cancel()
+
+    def _run() -> None:
+        try:
+            fut.set_result(get_client(non_interactive=True, require_smoke=False))
+        except Exception as e:
+            fut.set_exception(e)
+
+    threading.Thread(target=_run, name="doctor-client", daemon=True).start()
+    return fut
+
+
 def main() -> int:
     """
     Run the diagnostic checks.
@@ -180,14 +382,16 @@ def main() -> int:
         print("    Bitte Benutzer neu einrichten: ./chatti --user-add")
         return 1
 
-    # --- Step 2: Crypto library ---
-    try:
-        import cryptography  # noqa: F401
+    # Client-Aufbau (Netzwerk) erst jetzt im Hintergrund starten –
+    # überlappt mit den lokalen Checks (cryptography, Entschlüsselung)
+    client_future = _prefetch_client()
 
-        print("✅ cryptography installed")
-    except Exception:
+    # --- Step 2: Crypto library ---
+    # find_spec statt import: nur Vorhandensein prüfen, keine C-Extensions laden
+    if importlib.util.find_spec("cryptography") is None:
         print("❌ cryptography missing (pip install cryptography)")
         return 1
+    print("✅ cryptography installed")
 
     # --- Step 3: Try to decrypt with CHATTI_MASTER if set ---
     master = os.getenv("CHATTI_MASTER")
@@ -197,6 +401,8 @@ def main() -> int:
             print("✅ Master password from environment accepted. Key decrypted successfully.")
         except Exception as e:
             print(f"⚠️  Decryption with CHATTI_MASTER failed: {type(e).__name__}: {e}")
+            import traceback
+
             tb = traceback.format_exc(limit=1)
             print("    Details:", tb.strip())
             print("    Hint: check password or run interactively: ./chatti")
@@ -209,7 +415,7 @@ def main() -> int:
 
     # --- Step 4: Build client and run smoke test if possible ---
     try:
-        client = get_client(non_interactive=True, require_smoke=False)
+        client = client_future.result()
     except Exception as e:
         print(f"ℹ️  Client setup skipped: {e}")
         return 0  # still a valid diagnosis
@@ -227,20 +433,39 @@ def main() -> int:
     # 4b) Modell-Diagnose: Reachability + optional Mini-Probe (kurze Pings)
     yes_probe = ("--probe" in sys.argv) or (os.getenv("CHATTI_DOCTOR_PROBE") == "1")
     no_probe = ("--no-probe" in sys.argv) or (os.getenv("CHATTI_DOCTOR_NO_PROBE") == "1")
-    use_probe = False if no_probe else bool(yes_probe)  # Default: False (keine Token-Probe)
+    # --probe-batch: wie --probe, aber über die (langsame, günstige) Batch-API
+    use_batch = ("--probe-batch" in sys.argv) or (os.getenv("CHATTI_DOCTOR_PROBE_BATCH") == "1")
+    # Default: False (keine Token-Probe)
+    use_probe = False if no_probe else bool(yes_probe or use_batch)
+    use_deep = ("--deep" in sys.argv) or (os.getenv("CHATTI_DOCTOR_DEEP") == "1")
 
-    if use_probe:
+    if use_probe and use_batch:
+        print(
+            f"⏳ Prüfe Modelle per Batch-API (max_output_tokens=16)… "
+            f"wartet bis zu {_batch_wait_sec()} s, danach Echtzeit-Probe.",
+            flush=True,
+        )
+    elif use_probe:
         print(
             "⏳ Prüfe Modelle mit Mini-Token-Probe (max_output_tokens=16)… das kann einige Sekunden dauern.",
             flush=True,
         )
     else:
         print("⚡ Prüfe Modelle ohne Token-Verbrauch (nur Reachability).", flush=True)
+    if use_deep:
+        print("🔬 --deep: zusätzlich Modell-Metadaten je ID abrufen.", flush=True)
 
     try:
         # 0 = kein Limit
         max_models = int(os.getenv("CHATTI_DOCTOR_MAX", "0"))
-        rows = diagnose_models(client, probe=use_probe, timeout=2.0, max_models=max_models)
+        rows = diagnose_models(
+            client,
+            probe=use_probe,
+            deep=use_deep,
+            batch=use_batch,
+            timeout=2.0,
+            max_models=max_models,
+        )
         print(
             "\nModelldiagnose — {}".format(
                 "mit Mini-Token-Probe" if use_probe else "ohne Token-Probe"
@@ -251,29 +476,25 @@ def main() -> int:
             print("  Keine Modelle gelistet – API erreichbar, aber keine IDs gefunden.")
         else:
             # Default-Modell mit ⭐ markieren und Ausgabe sortieren:
-            status_rank = {"OK": 0, "Kein Zugriff": 1, "Nicht erreichbar": 2}
-
-            def star(mid: str) -> str:
-                return "⭐" if mid == model else " "
-
             rows_sorted = sorted(
                 rows,
                 key=lambda r: (
                     0 if r[0] == model else 1,  # Default-Modell zuerst
-                    status_rank.get(r[1], 99),  # Statusreihenfolge
+                    _STATUS_RANK.get(r[1], 99),  # Statusreihenfolge
                     r[0],  # dann alphabetisch
                 ),
             )
 
             any_ok = False
             for mid, status, hint in rows_sorted:
+                marker = "⭐" if mid == model else " "
                 if status == "OK":
                     any_ok = True
-                    print(f"  ✅ {star(mid)} {mid}")
+                    print(f"  ✅ {marker} {mid}")
                 elif status == "Kein Zugriff":
-                    print(f"  ⚠️  {star(mid)} {mid} – {hint or 'Kein Zugriff'}")
+                    print(f"  ⚠️  {marker} {mid} – {hint or 'Kein Zugriff'}")
                 else:
-                    print(f"  ❌ {star(mid)} {mid} – {hint or 'Nicht erreichbar'}")
+                    print(f"  ❌ {marker} {mid} – {hint or 'Nicht erreichbar'}")
 
             if not any_ok:
                 print("\nKeine Modelle sind aktuell nutzbar.")